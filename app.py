@@ -1,13 +1,36 @@
 import os
+import gzip
 import logging
-from flask import Flask
+from functools import wraps
+from flask import Flask, g, request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 from replit.object_storage import Client
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+class Config:
+    """Settings read from the environment once at startup"""
+    SECRET_KEY = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+    DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///spinwheel.db")
+    DEBUG = os.environ.get("FLASK_DEBUG") == "1"
+    # Pre-ping costs a SELECT 1 per checkout but is the only guard against stale connections
+    # in views without with_db_retry (the API and admin POSTs), so it stays on for server
+    # databases unless DB_POOL_PRE_PING=0; SQLite connections never go stale
+    DB_POOL_PRE_PING = os.environ.get(
+        "DB_POOL_PRE_PING", "0" if DATABASE_URL.startswith("sqlite") else "1"
+    ) == "1"
+    # Per-process pool bounds; size them to the worker's thread count, not the request rate
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+    # Secondary workers can skip folder setup once the primary has created the folders
+    SKIP_DIR_INIT = os.environ.get("SKIP_DIR_INIT") == "1"
+    # Log the number of SQL statements each request ran, to spot N+1 regressions
+    LOG_QUERY_COUNTS = os.environ.get("LOG_QUERY_COUNTS") == "1"
+
+# Configure logging (DEBUG records are costly on hot paths, so only in debug mode)
+logging.basicConfig(level=logging.DEBUG if Config.DEBUG else logging.INFO)
+logger = logging.getLogger(__name__)
 
 class Base(DeclarativeBase):
     pass
@@ -16,104 +39,188 @@ db = SQLAlchemy(model_class=Base)
 
 # Create the app
 app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+app.secret_key = Config.SECRET_KEY
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 # Configure the database
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///spinwheel.db")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+app.config["SQLALCHEMY_DATABASE_URI"] = Config.DATABASE_URL
+engine_options = {
     "pool_recycle": 300,
-    "pool_pre_ping": True,
+    "pool_pre_ping": Config.DB_POOL_PRE_PING,
+    "insertmanyvalues_page_size": 1000,
 }
+if not Config.DATABASE_URL.startswith("sqlite"):
+    # Pool sizing only applies to server databases; SQLite picks its own pool class
+    engine_options.update({
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_use_lifo": True,
+        "isolation_level": "READ COMMITTED",
+    })
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 # Configure file uploads
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Largest per-field cap is 50MB (background music) plus room for the other form fields;
+# larger bodies are rejected with 413 before any of them is read or spooled to disk
+app.config['MAX_CONTENT_LENGTH'] = 60 * 1024 * 1024
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
+# Compress text responses (HTML pages and the JSON API) with stdlib gzip
+app.config['COMPRESS_MIMETYPES'] = frozenset({'application/json', 'text/html', 'text/css', 'application/javascript'})
+app.config['COMPRESS_LEVEL'] = 5
+app.config['COMPRESS_MIN_SIZE'] = 500
+
+@app.after_request
+def compress_response(response):
+    """Gzip compressible responses for clients that accept it"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    if 'gzip' not in request.headers.get('Accept-Encoding', ''):
+        return response
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL']))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 # Ensure upload directory exists and is persistent
 upload_folder = app.config['UPLOAD_FOLDER']
 static_upload_folder = os.path.join('static', 'uploads')
 
-# Create both directories
-os.makedirs(upload_folder, exist_ok=True)
-os.makedirs(static_upload_folder, exist_ok=True)
-
-# Try to create symlink for better persistence (if not exists)
-try:
-    if not os.path.exists(os.path.join(upload_folder, '.persistent')):
-        # Create marker file
-        with open(os.path.join(upload_folder, '.persistent'), 'w') as f:
-            f.write('This folder contains uploaded files')
+def _ensure_upload_dirs():
+    """Create both upload folders and their marker files, skipping what already exists"""
+    markers = (
+        (upload_folder, '.persistent', b'This folder contains uploaded files'),
+        (static_upload_folder, '.backup', b'This is backup folder for uploads'),
+    )
+    for folder, _, _ in markers:
+        os.makedirs(folder, exist_ok=True)
     
-    if not os.path.exists(os.path.join(static_upload_folder, '.backup')):
-        # Create backup marker
-        with open(os.path.join(static_upload_folder, '.backup'), 'w') as f:
-            f.write('This is backup folder for uploads')
-except Exception as e:
-    logging.warning(f"Could not create persistence markers: {e}")
-
-# Initialize Object Storage client (optional)
-try:
-    storage_client = Client()
-    logging.info("Object Storage client initialized successfully")
-except Exception as e:
-    storage_client = None
-    logging.warning(f"Object Storage not available (bucket not configured): {e}")
-    logging.info("Using enhanced backup system instead")
+    try:
+        for folder, marker, text in markers:
+            # O_EXCL makes the existence check and the create a single syscall
+            try:
+                fd = os.open(os.path.join(folder, marker), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            try:
+                os.write(fd, text)
+            finally:
+                os.close(fd)
+    except Exception as e:
+        logger.warning("Could not create persistence markers: %s", e)
+
+if not Config.SKIP_DIR_INIT:
+    _ensure_upload_dirs()
+
+# Object Storage client (optional), created on first use to keep startup cheap
+_storage = {'client': None, 'initialized': False}
+
+def get_storage_client():
+    """Get the Object Storage client, or None if no bucket is configured"""
+    if not _storage['initialized']:
+        try:
+            _storage['client'] = Client()
+            logger.info("Object Storage client initialized successfully")
+        except Exception as e:
+            _storage['client'] = None
+            logger.warning("Object Storage not available (bucket not configured): %s", e)
+            logger.info("Using enhanced backup system instead")
+        _storage['initialized'] = True
+    return _storage['client']
 
 # Initialize the app with the extension
 db.init_app(app)
 
+if Config.LOG_QUERY_COUNTS:
+    from sqlalchemy import event
+    
+    with app.app_context():
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count_query(conn, cursor, statement, parameters, context, executemany):
+            """Count statements run inside a request"""
+            if g:
+                g.query_count = g.get('query_count', 0) + 1
+    
+    @app.after_request
+    def log_query_count(response):
+        """Log how many SQL statements the request ran"""
+        logger.info("%s %s ran %d queries", request.method, request.path, g.get('query_count', 0))
+        return response
+
+def with_db_retry(f):
+    """Decorator to retry a view once after a dropped database connection"""
+    # Only for idempotent (read-only) views: a retried write could run twice
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        try:
+            return f(*args, **kwargs)
+        except OperationalError as e:
+            logger.warning("Database connection error, retrying once: %s", e)
+            db.session.rollback()
+            db.engine.dispose()
+            return f(*args, **kwargs)
+    return decorated_function
+
 # Add timezone filter for templates
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 
 WIB = timezone(timedelta(hours=7))
+UTC = timezone.utc
+
+# Fallback text for the WIB filters
+WIB_UNSET_TEXT = 'Belum Diatur'
+
+# Output formats for the WIB filters, assembled directly instead of parsed by strftime
+def _format_wib_datetime(t):
+    return f"{t.day:02d}/{t.month:02d}/{t.year:04d} {t.hour:02d}:{t.minute:02d} WIB"
+
+def _format_wib_date(t):
+    return f"{t.day:02d}/{t.month:02d}/{t.year:04d}"
+
+def _format_wib_time(t):
+    return f"{t.hour:02d}:{t.minute:02d} WIB"
+
+@lru_cache(maxsize=1024)
+def _format_wib(dt, formatter):
+    """Convert datetime to WIB and format it, cached per (datetime, formatter)"""
+    # If datetime is naive (no timezone), assume it's UTC
+    return formatter(dt.replace(tzinfo=dt.tzinfo or UTC).astimezone(WIB))
+
+def _to_wib(dt, formatter):
+    """Shared implementation of the WIB template filters"""
+    if dt is None:
+        return WIB_UNSET_TEXT
+    return _format_wib(dt, formatter)
 
-@app.template_filter('wib')
 def wib_filter(dt):
     """Convert datetime to WIB timezone and format"""
-    if dt is None:
-        return 'Belum Diatur'
-    
-    # If datetime is naive (no timezone), assume it's UTC
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    
-    # Convert to WIB
-    wib_time = dt.astimezone(WIB)
-    return wib_time.strftime('%d/%m/%Y %H:%M WIB')
+    return _to_wib(dt, _format_wib_datetime)
 
-@app.template_filter('wib_date')
 def wib_date_filter(dt):
     """Convert datetime to WIB date only"""
-    if dt is None:
-        return 'Belum Diatur'
-    
-    # If datetime is naive (no timezone), assume it's UTC
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    
-    # Convert to WIB
-    wib_time = dt.astimezone(WIB)
-    return wib_time.strftime('%d/%m/%Y')
+    return _to_wib(dt, _format_wib_date)
 
-@app.template_filter('wib_time')
 def wib_time_filter(dt):
     """Convert datetime to WIB time only"""
-    if dt is None:
-        return 'Belum Diatur'
-    
-    # If datetime is naive (no timezone), assume it's UTC
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    
-    # Convert to WIB
-    wib_time = dt.astimezone(WIB)
-    return wib_time.strftime('%H:%M WIB')
+    return _to_wib(dt, _format_wib_time)
+
+# Register straight into the Jinja filter table; compiled templates resolve
+# each filter once per render, so no per-expression registry lookup remains
+app.jinja_env.filters.update(
+    wib=wib_filter,
+    wib_date=wib_date_filter,
+    wib_time=wib_time_filter,
+)
 
 with app.app_context():
     # Import models here so their tables are created
     import models  # noqa: F401
     db.create_all()
-    logging.info("Database tables created")
+    logger.info("Database tables created")
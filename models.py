@@ -1,26 +1,59 @@
-from datetime import datetime, timezone, timedelta
-from app import db
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Optional
+import time
+from app import db, WIB
+from jinja2.utils import htmlsafe_json_dumps
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Mapped, make_transient_to_detached, mapped_column
 from werkzeug.security import generate_password_hash, check_password_hash
-import secrets
+import random
+import threading
 import string
 
-# WIB Timezone (GMT+7)
-WIB = timezone(timedelta(hours=7))
+# CSPRNG-backed generator and alphabets for voucher codes
+_system_random = random.SystemRandom()
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_DIGITS = string.digits
+
+# Memory-hard native hash; verification reads the method back from the stored hash
+PASSWORD_HASH_METHOD = 'scrypt'
+
+# Seconds a worker may serve WheelSettings from memory before re-reading the row
+SETTINGS_CACHE_TTL = 30
+
+# Column snapshot of the settings row, shared by all requests in this process;
+# 'version' counts local invalidations so derived caches know when to rebuild
+_settings_cache = {'values': None, 'expires': 0.0, 'version': 0}
+
+# Seconds a worker may serve the active prize list from memory before re-querying
+PRIZE_CACHE_TTL = 30
+
+# Active prizes plus their cumulative weights, shared by all requests in this process
+_prize_cache = {'snapshot': None, 'expires': 0.0}
+_prize_cache_lock = threading.Lock()
 
 def wib_now():
     """Get current time in WIB timezone"""
     return datetime.now(WIB)
 
+def utc_now():
+    """Current time in UTC, the Python-side default next to server_default=func.now()"""
+    # Tables created before the server defaults existed keep no column DEFAULT (create_all
+    # never alters them), so the ORM still supplies the timestamp on insert
+    return datetime.now(timezone.utc)
+
 class Admin(db.Model):
     """Admin user model for authentication"""
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
-    created_at = db.Column(db.DateTime, default=wib_now)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    username: Mapped[str] = mapped_column(db.String(80), unique=True)
+    password_hash: Mapped[str] = mapped_column(db.String(256))
+    created_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime(timezone=True), default=utc_now, server_default=func.now())
     
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=PASSWORD_HASH_METHOD)
     
     def check_password(self, password):
         """Check password against hash"""
@@ -28,12 +61,16 @@ class Admin(db.Model):
 
 class Prize(db.Model):
     """Prize model for wheel prizes"""
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(200), nullable=False)
-    icon_path = db.Column(db.String(500))  # Path to uploaded icon
-    probability = db.Column(db.Float, default=10.0)  # Probability percentage (0-100)
-    is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=wib_now)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(db.String(200))
+    icon_path: Mapped[Optional[str]] = mapped_column(db.String(500))  # Path to uploaded icon
+    probability: Mapped[Optional[float]] = mapped_column(default=10.0)  # Probability percentage (0-100)
+    is_active: Mapped[Optional[bool]] = mapped_column(default=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime(timezone=True), default=utc_now, server_default=func.now())
+    
+    __table_args__ = (
+        db.Index('ix_prize_active', 'is_active'),
+    )
     
     def to_dict(self):
         """Convert prize to dictionary"""
@@ -45,104 +82,301 @@ class Prize(db.Model):
             'is_active': self.is_active
         }
 
+def get_active_prizes():
+    """Get active prizes in wheel order, served from the process cache when fresh
+    
+    Returns a dict with the prize dicts ('prizes'), the same list serialized
+    once for embedding in a <script> block ('prizes_json'), their running
+    probability totals ('cum_weights') with their sum ('total_weight') and a
+    prize id -> wheel position map ('index_by_id') and the angle each prize
+    covers on the wheel ('segment_angle'). Winners are drawn with a
+    C-level bisect over 'cum_weights', so a spin does no per-prize Python work.
+    """
+    snapshot = _prize_cache['snapshot']
+    if snapshot is not None and time.monotonic() < _prize_cache['expires']:
+        return snapshot
+    # One rebuild at a time; threads that waited reuse the fresh snapshot
+    with _prize_cache_lock:
+        snapshot = _prize_cache['snapshot']
+        if snapshot is not None and time.monotonic() < _prize_cache['expires']:
+            return snapshot
+        prizes = [prize.to_dict() for prize in Prize.query.filter_by(is_active=True).order_by(Prize.id)]
+        cum_weights = list(accumulate(prize['probability'] or 0.0 for prize in prizes))
+        snapshot = {
+            'prizes': prizes,
+            'prizes_json': htmlsafe_json_dumps(prizes),
+            'cum_weights': cum_weights,
+            'total_weight': cum_weights[-1] if cum_weights else 0.0,
+            'index_by_id': {prize['id']: i for i, prize in enumerate(prizes)},
+            'segment_angle': 360 / len(prizes) if prizes else 0.0,
+        }
+        _prize_cache['snapshot'] = snapshot
+        _prize_cache['expires'] = time.monotonic() + PRIZE_CACHE_TTL
+    return snapshot
+
+def invalidate_active_prizes():
+    """Drop the cached active prize list so the next read rebuilds it"""
+    _prize_cache['snapshot'] = None
+
+@event.listens_for(Prize, 'after_insert')
+@event.listens_for(Prize, 'after_update')
+@event.listens_for(Prize, 'after_delete')
+def _invalidate_prize_cache(mapper, connection, target):
+    """Drop the cached active prize list whenever a prize is flushed"""
+    invalidate_active_prizes()
+
 class Voucher(db.Model):
     """Voucher model for spin access control"""
-    id = db.Column(db.Integer, primary_key=True)
-    code = db.Column(db.String(50), unique=True, nullable=False)
-    is_used = db.Column(db.Boolean, default=False)
-    used_at = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=wib_now)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    code: Mapped[str] = mapped_column(db.String(50), unique=True)
+    is_used: Mapped[Optional[bool]] = mapped_column(default=False)
+    used_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime(timezone=True))
+    created_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime(timezone=True), default=utc_now, server_default=func.now())
     # VIP Voucher fields
-    is_vip = db.Column(db.Boolean, default=False)  # Mark as VIP voucher
-    guaranteed_prize_id = db.Column(db.Integer, db.ForeignKey('prize.id'), nullable=True)  # Guaranteed prize for VIP
-    vip_description = db.Column(db.String(200), nullable=True)  # Description for VIP voucher
+    is_vip: Mapped[Optional[bool]] = mapped_column(default=False)  # Mark as VIP voucher
+    guaranteed_prize_id: Mapped[Optional[int]] = mapped_column(db.ForeignKey('prize.id'))  # Guaranteed prize for VIP
+    vip_description: Mapped[Optional[str]] = mapped_column(db.String(200))  # Description for VIP voucher
+    
+    __table_args__ = (
+        # Serve the admin voucher lists (newest active, latest used) straight from the index
+        db.Index('ix_voucher_is_used_created_at', 'is_used', 'created_at'),
+        db.Index('ix_voucher_is_used_used_at', 'is_used', 'used_at'),
+        db.Index('ix_voucher_is_vip_is_used', 'is_vip', 'is_used'),
+    )
     
     # Relationship
-    guaranteed_prize = db.relationship('Prize', backref='vip_vouchers')
+    guaranteed_prize: Mapped[Optional['Prize']] = db.relationship('Prize', backref='vip_vouchers', lazy='joined')
     
     @staticmethod
     def generate_code(length=8):
         """Generate random voucher code"""
-        letters = string.ascii_uppercase + string.digits
-        return ''.join(secrets.choice(letters) for _ in range(length))
+        return ''.join(_system_random.choices(CODE_ALPHABET, k=length))
     
     @staticmethod
     def generate_code_with_prefix(prefix='SBO', random_length=5):
         """Generate voucher code with custom prefix + 5 random digits"""
-        digits = string.digits
-        random_part = ''.join(secrets.choice(digits) for _ in range(random_length))
+        random_part = ''.join(_system_random.choices(CODE_DIGITS, k=random_length))
         return f"{prefix}{random_part}"
     
+    @staticmethod
+    def get_by_code(code):
+        """Look up a voucher by its unique code"""
+        return db.session.scalar(select(Voucher).where(Voucher.code == code))
+    
+    @classmethod
+    def bulk_create(cls, prefix='SBO', count=1, batch_size=1000):
+        """Insert new prefixed vouchers with batched INSERTs, returning their codes"""
+        pending = set()
+        while len(pending) < count:
+            pending.add(cls.generate_code_with_prefix(prefix))
+        seen = set(pending)
+        pending = list(pending)
+        created = []
+        
+        while pending:
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            batch = cls._replace_taken_codes(prefix, batch, seen)
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(cls.__table__.insert(), [{'code': code} for code in batch])
+                created.extend(batch)
+            except IntegrityError:
+                # A concurrent insert claimed a code after the check; check the batch again
+                pending = batch + pending
+        
+        return created
+    
+    @classmethod
+    def _replace_taken_codes(cls, prefix, batch, seen):
+        """Swap codes that already exist for new ones, one IN query per round"""
+        size = len(batch)
+        candidates = batch
+        while True:
+            taken = set(db.session.scalars(select(cls.code).where(cls.code.in_(candidates))))
+            if not taken:
+                return batch
+            batch = [code for code in batch if code not in taken]
+            candidates = []
+            while len(batch) < size:
+                code = cls.generate_code_with_prefix(prefix)
+                if code not in seen:
+                    seen.add(code)
+                    batch.append(code)
+                    candidates.append(code)
+    
     def mark_used(self):
         """Mark voucher as used"""
         self.is_used = True
-        self.used_at = wib_now()
+        self.used_at = func.now()
+    
+    @staticmethod
+    def claim(code):
+        """Atomically mark an unused voucher as used, returning (id, is_vip, guaranteed_prize_id) or None"""
+        # The is_used predicate is re-checked on the locked row, so of two concurrent
+        # claims on one code only the first one gets a row back. SKIP LOCKED makes the
+        # loser come back empty at once instead of queueing behind the winner's
+        # transaction (PostgreSQL/MySQL 8+; SQLite has no row locks and ignores it)
+        claimable = (
+            select(Voucher.id)
+            .where(Voucher.code == code, Voucher.is_used.is_not(True))
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Voucher)
+            .where(Voucher.id == claimable, Voucher.is_used.is_not(True))
+            .values(is_used=True, used_at=func.now())
+            .returning(Voucher.id, Voucher.is_vip, Voucher.guaranteed_prize_id)
+        )
+        return db.session.execute(stmt).first()
+
+# Default look of the wheel page, one entry per theme column of WheelSettings.
+# Colors stay as '#RRGGBB' strings: they go verbatim into CSS, <input type=color>
+# and the API, and the single settings row is served from _settings_cache, so
+# packing them into integers would save nothing on the read path.
+THEME_DEFAULTS = {
+    'wheel_color_1': '#FF6B6B',
+    'wheel_color_2': '#4ECDC4',
+    'text_color': '#FFFFFF',
+    'border_color': '#333333',
+    'title_text': 'Lucky Spin Wheel',
+    'description_text': 'Masukkan kode voucher Anda dan putar untuk memenangkan hadiah menarik!',
+    'description_font_size': 18,
+    'description_color': '#ffffff',
+    'back_to_site_text': 'Kembali ke Situs',
+    'input_bg_color': '#ffffff',
+    'input_text_color': '#000000',
+    'button_bg_color': '#ffc107',
+    'button_text_color': '#000000',
+    'popup_enabled': False,
+    'popup_title': 'Selamat!',
+    'popup_link_text': 'Kunjungi Sekarang',
+    'glow_enabled': True,
+    'glow_color': '#FF6B6B',
+    'glow_intensity': 50,
+    'center_button_bg_color': '#ffd700',
+    'center_button_text_color': '#000000',
+    'back_button_bg_color': '#007bff',
+    'back_button_text_color': '#ffffff',
+    'prize_border_color': '#ffffff',
+    'prize_border_gradient_start': '#ff0000',
+    'prize_border_gradient_end': '#9400d3',
+    'container_bg_color': '#1a1a2e',
+}
 
 class WheelSettings(db.Model):
     """Settings for wheel customization"""
-    id = db.Column(db.Integer, primary_key=True)
-    logo_path = db.Column(db.String(500))  # Brand logo
-    background_path = db.Column(db.String(500))  # Background image
-    wheel_color_1 = db.Column(db.String(7), default='#FF6B6B')  # Primary wheel color
-    wheel_color_2 = db.Column(db.String(7), default='#4ECDC4')  # Secondary wheel color
-    text_color = db.Column(db.String(7), default='#FFFFFF')  # Text color
-    border_color = db.Column(db.String(7), default='#333333')  # Border color
-    title_text = db.Column(db.String(200), default='Lucky Spin Wheel')  # Customizable title
-    description_text = db.Column(db.String(500), default='Masukkan kode voucher Anda dan putar untuk memenangkan hadiah menarik!')  # Customizable description
-    description_font_size = db.Column(db.Integer, default=18)  # Description font size
-    description_color = db.Column(db.String(7), default='#ffffff')  # Description text color
-    back_to_site_url = db.Column(db.String(500))  # Back to site link
-    back_to_site_text = db.Column(db.String(100), default='Kembali ke Situs')  # Back button text
-    input_bg_color = db.Column(db.String(7), default='#ffffff')  # Input background color
-    input_text_color = db.Column(db.String(7), default='#000000')  # Input text color
-    button_bg_color = db.Column(db.String(7), default='#ffc107')  # Button background color
-    button_text_color = db.Column(db.String(7), default='#000000')  # Button text color
+    id: Mapped[int] = mapped_column(primary_key=True)
+    logo_path: Mapped[Optional[str]] = mapped_column(db.String(500))  # Brand logo
+    background_path: Mapped[Optional[str]] = mapped_column(db.String(500))  # Background image
+    wheel_color_1: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['wheel_color_1'])  # Primary wheel color
+    wheel_color_2: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['wheel_color_2'])  # Secondary wheel color
+    text_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['text_color'])  # Text color
+    border_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['border_color'])  # Border color
+    title_text: Mapped[Optional[str]] = mapped_column(db.String(200), default=THEME_DEFAULTS['title_text'])  # Customizable title
+    description_text: Mapped[Optional[str]] = mapped_column(db.String(500), default=THEME_DEFAULTS['description_text'])  # Customizable description
+    description_font_size: Mapped[Optional[int]] = mapped_column(default=THEME_DEFAULTS['description_font_size'])  # Description font size
+    description_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['description_color'])  # Description text color
+    back_to_site_url: Mapped[Optional[str]] = mapped_column(db.String(500))  # Back to site link
+    back_to_site_text: Mapped[Optional[str]] = mapped_column(db.String(100), default=THEME_DEFAULTS['back_to_site_text'])  # Back button text
+    input_bg_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['input_bg_color'])  # Input background color
+    input_text_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['input_text_color'])  # Input text color
+    button_bg_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['button_bg_color'])  # Button background color
+    button_text_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['button_text_color'])  # Button text color
     # Popup settings
-    popup_enabled = db.Column(db.Boolean, default=False)  # Enable/disable popup
-    popup_title = db.Column(db.String(200), default='Selamat!')  # Popup title
-    popup_description = db.Column(db.Text)  # Popup description
-    popup_image_path = db.Column(db.String(500))  # Popup image
-    popup_link_url = db.Column(db.String(500))  # Popup link URL
-    popup_link_text = db.Column(db.String(100), default='Kunjungi Sekarang')  # Popup link text
+    popup_enabled: Mapped[Optional[bool]] = mapped_column(default=THEME_DEFAULTS['popup_enabled'])  # Enable/disable popup
+    popup_title: Mapped[Optional[str]] = mapped_column(db.String(200), default=THEME_DEFAULTS['popup_title'])  # Popup title
+    popup_description: Mapped[Optional[str]] = mapped_column(db.Text)  # Popup description
+    popup_image_path: Mapped[Optional[str]] = mapped_column(db.String(500))  # Popup image
+    popup_link_url: Mapped[Optional[str]] = mapped_column(db.String(500))  # Popup link URL
+    popup_link_text: Mapped[Optional[str]] = mapped_column(db.String(100), default=THEME_DEFAULTS['popup_link_text'])  # Popup link text
     # Aura glow settings
-    glow_enabled = db.Column(db.Boolean, default=True)  # Enable/disable glow effect
-    glow_color = db.Column(db.String(7), default='#FF6B6B')  # Glow/aura color
-    glow_intensity = db.Column(db.Integer, default=50)  # Glow intensity (0-100)
+    glow_enabled: Mapped[Optional[bool]] = mapped_column(default=THEME_DEFAULTS['glow_enabled'])  # Enable/disable glow effect
+    glow_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['glow_color'])  # Glow/aura color
+    glow_intensity: Mapped[Optional[int]] = mapped_column(default=THEME_DEFAULTS['glow_intensity'])  # Glow intensity (0-100)
     # Center button settings
-    center_button_bg_color = db.Column(db.String(7), default='#ffd700')  # Center button background
-    center_button_text_color = db.Column(db.String(7), default='#000000')  # Center button text
+    center_button_bg_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['center_button_bg_color'])  # Center button background
+    center_button_text_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['center_button_text_color'])  # Center button text
     # Back button settings
-    back_button_bg_color = db.Column(db.String(7), default='#007bff')  # Back button background
-    back_button_text_color = db.Column(db.String(7), default='#ffffff')  # Back button text
+    back_button_bg_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['back_button_bg_color'])  # Back button background
+    back_button_text_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['back_button_text_color'])  # Back button text
     # Prize border settings
-    prize_border_color = db.Column(db.String(7), default='#ffffff')  # Prize card border color
-    prize_border_gradient_start = db.Column(db.String(7), default='#ff0000')  # Prize border gradient start color
-    prize_border_gradient_end = db.Column(db.String(7), default='#9400d3')  # Prize border gradient end color
+    prize_border_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['prize_border_color'])  # Prize card border color
+    prize_border_gradient_start: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['prize_border_gradient_start'])  # Prize border gradient start color
+    prize_border_gradient_end: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['prize_border_gradient_end'])  # Prize border gradient end color
     # Container settings
-    container_bg_color = db.Column(db.String(7), default='#1a1a2e')  # Main container background color
+    container_bg_color: Mapped[Optional[str]] = mapped_column(db.String(7), default=THEME_DEFAULTS['container_bg_color'])  # Main container background color
     # Background music settings
-    music_path = db.Column(db.String(500))  # Background music file path
+    music_path: Mapped[Optional[str]] = mapped_column(db.String(500))  # Background music file path
     # Spin sound settings
-    spin_sound_path = db.Column(db.String(500))  # Spin sound effect file path
-    updated_at = db.Column(db.DateTime, default=wib_now, onupdate=wib_now)
+    spin_sound_path: Mapped[Optional[str]] = mapped_column(db.String(500))  # Spin sound effect file path
+    updated_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime(timezone=True), default=utc_now, server_default=func.now(), onupdate=func.now())
+    
+    @property
+    def theme(self):
+        """Display settings as a plain dict, keyed like THEME_DEFAULTS"""
+        return {key: getattr(self, key) for key in THEME_DEFAULTS}
     
     @staticmethod
     def get_settings():
-        """Get or create wheel settings"""
-        settings = WheelSettings.query.first()
+        """Get or create wheel settings, served from the process cache when fresh"""
+        values = _settings_cache['values']
+        if values is not None and time.monotonic() < _settings_cache['expires']:
+            # Reuse the instance already attached to this session, if any
+            existing = db.session.identity_map.get(db.session.identity_key(WheelSettings, values['id']))
+            if existing is not None:
+                return existing
+            # Rebuild the row from the snapshot and attach it without a SELECT
+            settings = WheelSettings(**values)
+            make_transient_to_detached(settings)
+            return db.session.merge(settings, load=False)
+        
+        # Plain 2.0 select; its compiled form is reused from the statement cache on refills
+        settings = db.session.execute(select(WheelSettings).limit(1)).scalar()
         if not settings:
             settings = WheelSettings()
             db.session.add(settings)
             db.session.commit()
+        
+        _settings_cache['values'] = {attr.key: getattr(settings, attr.key) for attr in inspect(WheelSettings).column_attrs}
+        _settings_cache['expires'] = time.monotonic() + SETTINGS_CACHE_TTL
         return settings
 
+def invalidate_settings_cache():
+    """Drop the cached settings snapshot so the next read reloads the row"""
+    _settings_cache['values'] = None
+    _settings_cache['version'] += 1
+
+def get_settings_version():
+    """Number of settings invalidations seen by this process"""
+    return _settings_cache['version']
+
+@event.listens_for(WheelSettings, 'after_insert')
+@event.listens_for(WheelSettings, 'after_update')
+@event.listens_for(WheelSettings, 'after_delete')
+def _invalidate_settings_cache(mapper, connection, target):
+    """Drop the cached settings snapshot whenever the row is flushed"""
+    invalidate_settings_cache()
+
 class SpinResult(db.Model):
     """Track spin results for analytics"""
-    id = db.Column(db.Integer, primary_key=True)
-    voucher_id = db.Column(db.Integer, db.ForeignKey('voucher.id'), nullable=False)
-    prize_id = db.Column(db.Integer, db.ForeignKey('prize.id'), nullable=False)
-    username = db.Column(db.String(100), nullable=True)  # Username pemenang
-    spun_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    voucher = db.relationship('Voucher', backref='spin_results')
-    prize = db.relationship('Prize', backref='spin_results')
+    id: Mapped[int] = mapped_column(primary_key=True)
+    voucher_id: Mapped[int] = mapped_column(db.ForeignKey('voucher.id'))
+    prize_id: Mapped[int] = mapped_column(db.ForeignKey('prize.id'))
+    username: Mapped[Optional[str]] = mapped_column(db.String(100))  # Username pemenang
+    spun_at: Mapped[Optional[datetime]] = mapped_column(db.DateTime(timezone=True), default=utc_now, server_default=func.now())
+    
+    __table_args__ = (
+        # B-tree matching the "latest winners" ORDER BY spun_at DESC, id DESC ... LIMIT queries,
+        # read backwards so the listing stops after one page without a sort. On PostgreSQL it
+        # also carries the join keys and username, so the spin side of each page is index-only
+        db.Index('ix_spinresult_spun_at_id', 'spun_at', 'id',
+                 postgresql_include=['prize_id', 'voucher_id', 'username']),
+        # BRIN stays tiny on this append-only column and serves date-range analytics (PostgreSQL only)
+        db.Index('ix_spinresult_spun_at_brin', 'spun_at', postgresql_using='brin').ddl_if(dialect='postgresql'),
+        db.Index('ix_spinresult_voucher_prize', 'voucher_id', 'prize_id'),
+        db.Index('ix_spinresult_prize_id', 'prize_id'),
+    )
+    
+    voucher: Mapped['Voucher'] = db.relationship('Voucher', backref='spin_results', lazy='joined')
+    prize: Mapped['Prize'] = db.relationship('Prize', backref='spin_results', lazy='joined')
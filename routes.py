@@ -1,81 +1,233 @@
 import os
 import random
 import secrets
+import shutil
+import hashlib
+import itertools
+import tempfile
 import threading
-from datetime import datetime
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from urllib.parse import quote
 from flask import render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory, Response
+from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
 from PIL import Image
 import logging
 import io
 
-from app import app, db, storage_client
-from models import Admin, Prize, Voucher, WheelSettings, SpinResult, wib_now
+from app import app, db, get_storage_client, with_db_retry
+from models import Admin, Prize, Voucher, WheelSettings, SpinResult, THEME_DEFAULTS, wib_now, get_active_prizes, invalidate_active_prizes, invalidate_settings_cache, get_settings_version
 
 # Allowed file extensions for uploads
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'bmp', 'tiff', 'tif', 'ico'}
-ALLOWED_AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'm4a', 'aac', 'flac', 'wma', 'opus', 'mp4'}
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp', 'bmp', 'tiff', 'tif', 'ico'})
+# Image formats stored as uploaded, to preserve animation, vectors and icon layers
+UNRESIZED_EXTENSIONS = frozenset({'gif', 'svg', 'ico'})
+ALLOWED_AUDIO_EXTENSIONS = frozenset({'mp3', 'wav', 'ogg', 'm4a', 'aac', 'flac', 'wma', 'opus', 'mp4'})
+# Formats accepted by the password-protected logo upload
+LOGO_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif'})
+# Content types for uploads served from Object Storage or the backup copies
+MIME_TYPES = {
+    'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg',
+    'gif': 'image/gif', 'svg': 'image/svg+xml', 'webp': 'image/webp',
+    'bmp': 'image/bmp', 'ico': 'image/x-icon',
+    'mp3': 'audio/mpeg', 'wav': 'audio/wav', 'ogg': 'audio/ogg',
+    'm4a': 'audio/mp4', 'aac': 'audio/aac', 'flac': 'audio/flac',
+    'wma': 'audio/x-ms-wma', 'opus': 'audio/opus'
+}
+
+# Per-thread generators for the spin draw and animation, so concurrent spins never share one
+_tls = threading.local()
+
+def _rng():
+    """Get this thread's random.Random, seeding it on first use"""
+    rng = getattr(_tls, 'rng', None)
+    if rng is None:
+        rng = _tls.rng = random.Random(secrets.randbits(64))
+    return rng
+
+def _draw_prize_index(cum_weights, total_weight):
+    """Draw a wheel position from the cached running probability totals"""
+    # Same draw as random.choices(cum_weights=...), which bisects internally, minus its per-call
+    # validation and list building. The first running total above the draw wins: the draw is
+    # below total_weight so the index is in range, and zero-probability prizes are never picked
+    return bisect_right(cum_weights, _rng().random() * total_weight)
+
+# Tie-breaker for uploads stamped in the same nanosecond within this process
+_upload_counter = itertools.count()
+
+def _unique_suffix():
+    """Time-based filename prefix that stays unique for uploads in the same second"""
+    return f"{time.time_ns()}_{next(_upload_counter)}"
+
+@lru_cache(maxsize=512)
+def _ext(filename):
+    """Lowercased extension of filename, or '' if it has none"""
+    i = filename.rfind('.')
+    return filename[i + 1:].lower() if i >= 0 else ''
+
+def _upload_path(filename):
+    """Path of an upload in the main uploads folder"""
+    return os.path.join(app.config['UPLOAD_FOLDER'], filename)
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return _ext(filename) in ALLOWED_EXTENSIONS
 
 def allowed_audio_file(filename):
     """Check if audio file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_AUDIO_EXTENSIONS
+    return _ext(filename) in ALLOWED_AUDIO_EXTENSIONS
 
-def save_to_storage(file_content, filename):
-    """Save file with multiple backup redundancy"""
+# Read size when streaming uploads into the blob store
+BLOB_CHUNK_SIZE = 64 * 1024
+
+def _blob_root():
+    """Directory holding the content-addressed blobs"""
+    return os.path.join(os.path.expanduser('~'), '.app_backups', 'blobs')
+
+def _blob_path(content_hash):
+    """Content-addressed location of a blob, sharded by the first two hex digits"""
+    return os.path.join(_blob_root(), content_hash[:2], content_hash)
+
+def _store_blob(file_content):
+    """Write file_content (bytes or a binary file object) to the blob store once and return its path"""
+    if not isinstance(file_content, bytes):
+        return _store_blob_stream(file_content)
+    blob_path = _blob_path(hashlib.sha256(file_content).hexdigest())
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
     try:
-        # Save to multiple locations for maximum persistence
-        locations_saved = 0
-        
-        # 1. Save to main upload folder
-        try:
-            os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-            locations_saved += 1
-            logging.info(f"File saved to main uploads: {filename}")
-        except Exception as e:
-            logging.error(f"Error saving to main uploads: {e}")
-        
-        # 2. Save to static/uploads backup
-        try:
-            static_folder = os.path.join('static', 'uploads')
-            os.makedirs(static_folder, exist_ok=True)
-            backup_path = os.path.join(static_folder, filename)
-            with open(backup_path, 'wb') as f:
-                f.write(file_content)
-            locations_saved += 1
-            logging.info(f"File saved to static backup: {filename}")
-        except Exception as e:
-            logging.error(f"Error saving to static backup: {e}")
-        
-        # 3. Try Object Storage if available (best for persistence)
+        fd = os.open(blob_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        logging.info(f"Blob already stored, skipping write: {blob_path}")
+        return blob_path
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(file_content)
+    except Exception:
+        os.remove(blob_path)
+        raise
+    return blob_path
+
+def _store_blob_stream(stream):
+    """Copy a file object into the blob store in chunks, hashing as it goes"""
+    os.makedirs(_blob_root(), exist_ok=True)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=_blob_root())
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: stream.read(BLOB_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                f.write(chunk)
+        blob_path = _blob_path(digest.hexdigest())
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
         try:
-            if storage_client:
+            # Linking never replaces an existing blob, so it doubles as the dedup check
+            os.link(tmp_path, blob_path)
+        except FileExistsError:
+            logging.info(f"Blob already stored, skipping write: {blob_path}")
+    finally:
+        os.remove(tmp_path)
+    return blob_path
+
+def _place_file(file_content, blob_path, target):
+    """Make target a hardlink to the blob, copying if linking fails or writing if there is no blob"""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if blob_path is None:
+        with open(target, 'wb') as f:
+            f.write(file_content)
+        return
+    # Link to a temp name first so an existing target is swapped atomically, never truncated
+    tmp_path = f"{target}.{threading.get_ident()}.tmp"
+    try:
+        os.link(blob_path, tmp_path)
+    except OSError:
+        shutil.copyfile(blob_path, tmp_path)
+    os.replace(tmp_path, target)
+
+def _write_main(file_content, blob_path, filename):
+    """Save to the main upload folder"""
+    try:
+        _place_file(file_content, blob_path, _upload_path(filename))
+        logging.info(f"File saved to main uploads: {filename}")
+        return True
+    except Exception as e:
+        logging.error(f"Error saving to main uploads: {e}")
+        return False
+
+def _write_static(file_content, blob_path, filename):
+    """Save to the static/uploads backup"""
+    try:
+        _place_file(file_content, blob_path, os.path.join('static', 'uploads', filename))
+        logging.info(f"File saved to static backup: {filename}")
+        return True
+    except Exception as e:
+        logging.error(f"Error saving to static backup: {e}")
+        return False
+
+def _write_object(file_content, blob_path, filename):
+    """Upload to Object Storage if available (best for persistence)"""
+    try:
+        storage_client = get_storage_client()
+        if storage_client:
+            if file_content is None:
+                storage_client.upload_from_filename(filename, blob_path)
+            else:
                 storage_client.upload_from_bytes(filename, file_content)
-                locations_saved += 1
-                logging.info(f"File saved to Object Storage: {filename}")
-        except Exception as e:
-            logging.warning(f"Object Storage upload failed: {e}")
-        
-        # 4. Create additional backup in home directory (most persistent)
+            logging.info(f"File saved to Object Storage: {filename}")
+            return True
+    except Exception as e:
+        logging.warning(f"Object Storage upload failed: {e}")
+    return False
+
+def _write_home(file_content, blob_path, filename):
+    """Save to the home directory backup (most persistent)"""
+    try:
+        _place_file(file_content, blob_path, os.path.join(os.path.expanduser('~'), '.app_backups', filename))
+        logging.info(f"File saved to home backup: {filename}")
+        return True
+    except Exception as e:
+        logging.warning(f"Home backup failed: {e}")
+        return False
+
+_LOCAL_WRITERS = (_write_main, _write_static, _write_home)
+_STORAGE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='storage')
+STORAGE_WAIT_TIMEOUT = 5
+
+def save_to_storage(file_content, filename):
+    """Save file with multiple backup redundancy
+    
+    file_content is bytes or a binary file object; file objects are streamed
+    into the blob store in chunks rather than read into memory.
+    """
+    try:
+        # Store the bytes once; the filesystem locations become hardlinks to the blob
         try:
-            home_backup = os.path.join(os.path.expanduser('~'), '.app_backups')
-            os.makedirs(home_backup, exist_ok=True)
-            home_path = os.path.join(home_backup, filename)
-            with open(home_path, 'wb') as f:
-                f.write(file_content)
-            locations_saved += 1
-            logging.info(f"File saved to home backup: {filename}")
+            blob_path = _store_blob(file_content)
         except Exception as e:
-            logging.warning(f"Home backup failed: {e}")
+            blob_path = None
+            logging.warning(f"Blob store unavailable, writing copies directly: {e}")
+            if not isinstance(file_content, bytes):
+                file_content.seek(0)
+                file_content = file_content.read()
+        
+        # Object Storage is a network round trip; upload in the background without blocking the request.
+        # Streamed uploads are sent from the blob file so the bytes never sit in memory
+        object_content = file_content if isinstance(file_content, bytes) else None
+        _STORAGE_POOL.submit(_write_object, object_content, blob_path, filename)
+        
+        if blob_path:
+            # Linking is metadata-only, cheaper inline than a thread hop
+            locations_saved = sum(1 for writer in _LOCAL_WRITERS if writer(file_content, blob_path, filename))
+        else:
+            # Full copies are independent disk writes, so write them concurrently
+            futures = [_STORAGE_POOL.submit(writer, file_content, None, filename) for writer in _LOCAL_WRITERS]
+            done, _ = wait(futures, timeout=STORAGE_WAIT_TIMEOUT)
+            locations_saved = sum(1 for future in done if future.result())
         
         if locations_saved > 0:
-            logging.info(f"File {filename} saved to {locations_saved} locations")
+            logging.info(f"File {filename} saved to {locations_saved} local locations")
             return filename
         else:
             raise Exception("Failed to save file to any location")
@@ -90,11 +242,11 @@ def get_from_storage(filename):
         # Priority order for file retrieval
         search_locations = [
             # 1. Object Storage (if available) - most persistent
-            lambda: storage_client.download_as_bytes(filename) if storage_client else None,
+            lambda: get_storage_client().download_as_bytes(filename) if get_storage_client() else None,
             # 2. Home backup directory - most persistent on filesystem
             lambda: open(os.path.join(os.path.expanduser('~'), '.app_backups', filename), 'rb').read(),
             # 3. Main uploads folder
-            lambda: open(os.path.join(app.config['UPLOAD_FOLDER'], filename), 'rb').read(),
+            lambda: open(_upload_path(filename), 'rb').read(),
             # 4. Static uploads backup
             lambda: open(os.path.join('static', 'uploads', filename), 'rb').read(),
         ]
@@ -108,7 +260,7 @@ def get_from_storage(filename):
                     
                     # Auto-restore to other locations if found in backup
                     if i > 0:  # If not from primary location, restore to others
-                        threading.Thread(target=restore_to_all_locations, args=(filename, file_content)).start()
+                        _schedule_restore(filename, file_content)
                     
                     return file_content
             except Exception as e:
@@ -121,6 +273,18 @@ def get_from_storage(filename):
         logging.error(f"Error retrieving file {filename}: {e}")
         return None
 
+# Filenames with a restore queued or running, so concurrent misses queue it only once
+_restoring = set()
+_restoring_lock = threading.Lock()
+
+def _schedule_restore(filename, file_content):
+    """Queue a restore of filename on the storage pool unless one is already pending"""
+    with _restoring_lock:
+        if filename in _restoring:
+            return
+        _restoring.add(filename)
+    _STORAGE_POOL.submit(restore_to_all_locations, filename, file_content)
+
 def restore_to_all_locations(filename, file_content):
     """Background task to restore file to all backup locations"""
     try:
@@ -128,43 +292,117 @@ def restore_to_all_locations(filename, file_content):
         logging.info(f"File {filename} restored to all backup locations")
     except Exception as e:
         logging.error(f"Error restoring file {filename}: {e}")
+    finally:
+        with _restoring_lock:
+            _restoring.discard(filename)
+
+def _resize_pil(img, max_size):
+    """Resize a decoded image in memory, returning the image to encode"""
+    # Preserve transparency for formats that support it
+    if img.format in ['PNG', 'WEBP'] and img.mode in ('RGBA', 'LA'):
+        # Keep RGBA mode for transparency
+        pass
+    elif img.mode in ('RGBA', 'LA', 'P'):
+        # Convert to RGB for other formats
+        img = img.convert('RGB')
+    
+    # Resize maintaining aspect ratio; reducing_gap lets JPEGs decode at 1/2-1/8 scale
+    # via draft() before the LANCZOS pass, which keeps large photo uploads cheap
+    img.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return img
+
+def _thumbnail_to(img, dest, max_size):
+    """Resize an open image and encode it once to dest (a path or file object)"""
+    original_format = img.format
+    img = _resize_pil(img, max_size)
+    
+    # Save in original format if possible, otherwise use PNG for transparency
+    if original_format in ['PNG', 'WEBP'] and img.mode == 'RGBA':
+        img.save(dest, original_format, quality=85, optimize=True)
+    elif original_format == 'PNG':
+        img.save(dest, 'PNG', quality=85, optimize=True)
+    else:
+        img.save(dest, 'JPEG', quality=85, optimize=True, progressive=True)
+
+def resize_image_bytes(file_content, filename, max_size=(300, 300)):
+    """Resize uploaded image bytes in memory, returning the original bytes if they cannot be resized"""
+    try:
+        if _ext(filename) in UNRESIZED_EXTENSIONS:
+            return file_content
+        
+        out = io.BytesIO()
+        with Image.open(io.BytesIO(file_content)) as img:
+            _thumbnail_to(img, out, max_size)
+        return out.getvalue()
+    except Exception as e:
+        logging.error(f"Error resizing image {filename}: {e}")
+        return file_content
 
 def resize_image(image_path, max_size=(300, 300)):
     """Resize uploaded image to max dimensions"""
     try:
         # Skip processing for certain formats to preserve their properties
-        file_ext = image_path.lower().split('.')[-1]
+        file_ext = _ext(image_path)
         
-        if file_ext in ['gif', 'svg', 'ico']:
+        if file_ext in UNRESIZED_EXTENSIONS:
             # Just check file size and return for special formats
             file_size = os.path.getsize(image_path)
             if file_size > 10 * 1024 * 1024:  # 10MB limit for special formats
                 logging.warning(f"Special format file {image_path} is too large ({file_size} bytes)")
             return
         
+        # Encode next to the original and swap it in, so a concurrent request never reads a half-written file
+        tmp_path = f"{image_path}.tmp"
         with Image.open(image_path) as img:
-            original_format = img.format
-            
-            # Preserve transparency for formats that support it
-            if original_format in ['PNG', 'WEBP'] and img.mode in ('RGBA', 'LA'):
-                # Keep RGBA mode for transparency
-                pass
-            elif img.mode in ('RGBA', 'LA', 'P'):
-                # Convert to RGB for other formats
-                img = img.convert('RGB')
-            
-            # Resize maintaining aspect ratio
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save in original format if possible, otherwise use PNG for transparency
-            if original_format in ['PNG', 'WEBP'] and img.mode == 'RGBA':
-                img.save(image_path, original_format, quality=85, optimize=True)
-            elif original_format == 'PNG':
-                img.save(image_path, 'PNG', quality=85, optimize=True)
-            else:
-                img.save(image_path, 'JPEG', quality=85)
+            _thumbnail_to(img, tmp_path, max_size)
+        os.replace(tmp_path, image_path)
     except Exception as e:
         logging.error(f"Error resizing image {image_path}: {e}")
+        try:
+            os.remove(f"{image_path}.tmp")
+        except OSError:
+            pass
+
+def process_logo(stream, file_path, filename):
+    """Decode a logo from its upload stream, write the resized, flattened file once and back it up"""
+    with Image.open(stream) as image:
+        original_format = image.format
+        
+        # Resize logo ke ukuran maksimal 300x300 sambil mempertahankan aspect ratio;
+        # reducing_gap lets JPEGs decode at reduced scale (draft) before the LANCZOS pass
+        image.thumbnail((300, 300), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        
+        # Convert RGBA to RGB if necessary, after the resize so only the small image is composited
+        if image.mode == 'RGBA':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        image.save(file_path, original_format, optimize=True, quality=85, progressive=True)
+    
+    # Backup in static folder for better persistence, as a hardlink to the final file
+    _place_file(None, file_path, os.path.join('static', 'uploads', filename))
+
+def _exceeds_upload_limit(file, limit):
+    """Check whether an uploaded file is larger than limit bytes"""
+    # A request body under the limit bounds every part in it, so most uploads need no probe
+    if request.content_length is not None and request.content_length <= limit:
+        return False
+    file.stream.seek(0, os.SEEK_END)
+    file_size = file.stream.tell()
+    file.stream.seek(0)
+    return file_size > limit
+
+def save_resized_upload(file, file_path, max_size=(300, 300)):
+    """Decode an uploaded image from its stream and write the resized file once"""
+    if _ext(file_path) not in UNRESIZED_EXTENSIONS:
+        try:
+            with Image.open(file.stream) as img:
+                _thumbnail_to(img, file_path, max_size)
+            return
+        except Exception as e:
+            logging.error(f"Error resizing image {file_path}: {e}")
+            file.stream.seek(0)
+    file.save(file_path)
 
 def is_admin_logged_in():
     """Check if admin is logged in"""
@@ -182,13 +420,14 @@ def admin_required(f):
 
 # Public Routes
 @app.route('/')
+@with_db_retry
 def index():
     """Main spin wheel page"""
     settings = WheelSettings.get_settings()
-    prizes = Prize.query.filter_by(is_active=True).all()
-    # Convert prizes to dictionaries for JSON serialization
-    prizes_data = [prize.to_dict() for prize in prizes]
-    return render_template('index.html', settings=settings, prizes=prizes_data)
+    # Cached prize dictionaries in wheel order, plus their pre-serialized JSON
+    active_prizes = get_active_prizes()
+    return render_template('index.html', settings=settings, prizes=active_prizes['prizes'],
+                           prizes_json=active_prizes['prizes_json'])
 
 @app.route('/spin', methods=['POST'])
 def spin_wheel():
@@ -199,43 +438,34 @@ def spin_wheel():
         return jsonify({'error': 'Please enter a voucher code'}), 400
     
     # Validate voucher
-    voucher = Voucher.query.filter_by(code=voucher_code, is_used=False).first()
-    if not voucher:
+    voucher = Voucher.get_by_code(voucher_code)
+    if not voucher or voucher.is_used:
         return jsonify({'error': 'Invalid or already used voucher code'}), 400
     
     # Get active prizes (needed for both VIP and regular vouchers)
-    prizes = Prize.query.filter_by(is_active=True).all()
+    active_prizes = get_active_prizes()
+    prizes = active_prizes['prizes']
     if not prizes:
         return jsonify({'error': 'No prizes available'}), 400
     
     # Check if this is a VIP voucher with guaranteed prize
     if voucher.is_vip and voucher.guaranteed_prize_id:
-        winner = Prize.query.get(voucher.guaranteed_prize_id)
-        if not winner or not winner.is_active:
+        # Only active prizes are on the wheel
+        winner_index = active_prizes['index_by_id'].get(voucher.guaranteed_prize_id)
+        if winner_index is None:
             return jsonify({'error': 'VIP prize is no longer available'}), 400
     else:
         # Regular voucher - use probability system
-        
-        # Calculate weighted random selection
-        weights = [prize.probability for prize in prizes]
-        total_weight = sum(weights)
+        cum_weights = active_prizes['cum_weights']
+        total_weight = active_prizes['total_weight']
         
         if total_weight <= 0:
             return jsonify({'error': 'No prizes with valid probabilities'}), 400
         
         # Select winner based on probability weights
-        rand_val = random.uniform(0, total_weight)
-        cumulative = 0
-        winner = None
-        
-        for prize in prizes:
-            cumulative += prize.probability
-            if rand_val <= cumulative:
-                winner = prize
-                break
-        
-        if not winner:
-            winner = prizes[-1]  # Fallback to last prize
+        winner_index = _draw_prize_index(cum_weights, total_weight)
+    
+    winner = prizes[winner_index]
     
     # Mark voucher as used
     voucher.mark_used()
@@ -243,27 +473,39 @@ def spin_wheel():
     # Record spin result
     spin_result = SpinResult()
     spin_result.voucher_id = voucher.id
-    spin_result.prize_id = winner.id
+    spin_result.prize_id = winner['id']
     db.session.add(spin_result)
     db.session.commit()
+    invalidate_winners_cache()
     
     # Calculate rotation angle for animation
-    prize_count = len(prizes)
-    segment_angle = 360 / prize_count
-    winner_index = next(i for i, p in enumerate(prizes) if p.id == winner.id)
+    segment_angle = active_prizes['segment_angle']
     
     # Add multiple full rotations plus angle to winner segment
-    base_rotations = random.randint(5, 8) * 360
-    winner_angle = winner_index * segment_angle + (segment_angle / 2)
+    base_rotations = _rng().randint(5, 8) * 360
+    winner_angle = (winner_index + 0.5) * segment_angle
     final_angle = base_rotations + (360 - winner_angle)  # Invert because wheel spins clockwise
     
     return jsonify({
         'success': True,
-        'prize': winner.to_dict(),
+        'prize': winner,
         'rotation': final_angle,
         'spin_id': spin_result.id
     })
 
+def _set_spin_username(spin_id, username):
+    """Set the winner's username on a spin result, returning False if there is no such spin"""
+    from sqlalchemy import update
+    try:
+        spin_id = int(spin_id)
+    except (TypeError, ValueError):
+        return False
+    result = db.session.execute(
+        update(SpinResult).where(SpinResult.id == spin_id).values(username=username),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount > 0
+
 @app.route('/save_username', methods=['POST'])
 def save_username():
     """Save username for spin result"""
@@ -273,14 +515,11 @@ def save_username():
     if not spin_id or not username:
         return jsonify({'error': 'Missing spin ID or username'}), 400
     
-    # Find spin result
-    spin_result = SpinResult.query.get(spin_id)
-    if not spin_result:
+    # Update username in one statement; loading the row would also join its prize and voucher
+    if not _set_spin_username(spin_id, username):
         return jsonify({'error': 'Spin result not found'}), 404
-    
-    # Update username
-    spin_result.username = username
     db.session.commit()
+    invalidate_winners_cache()
     
     return jsonify({'success': True})
 
@@ -295,6 +534,7 @@ def admin_login():
 @app.route('/admin/login', methods=['POST'])
 def admin_login_post():
     """Handle admin login"""
+    from sqlalchemy import func, select
     username = request.form.get('username', '').strip()
     password = request.form.get('password', '')
     
@@ -305,7 +545,7 @@ def admin_login_post():
     # Check if admin exists, create default admin if none exist
     admin = Admin.query.filter_by(username=username).first()
     if not admin:
-        admin_count = Admin.query.count()
+        admin_count = db.session.scalar(select(func.count()).select_from(Admin))
         if admin_count == 0 and username == 'admin':
             # Create default admin account
             default_admin = Admin()
@@ -333,13 +573,26 @@ def admin_logout():
 
 @app.route('/admin/dashboard')
 @admin_required
+@with_db_retry
 def admin_dashboard():
     """Admin dashboard"""
-    prize_count = Prize.query.count()
-    voucher_count = Voucher.query.filter_by(is_used=False, is_vip=False).count()
-    used_voucher_count = Voucher.query.filter_by(is_used=True).count()
-    vip_voucher_count = Voucher.query.filter_by(is_vip=True).count()
-    spin_count = SpinResult.query.count()
+    from sqlalchemy import func, select
+    prize_count, spin_count = db.session.execute(select(
+        select(func.count()).select_from(Prize).scalar_subquery(),
+        select(func.count()).select_from(SpinResult).scalar_subquery(),
+    )).one()
+    
+    # One pass over voucher, counted per (is_used, is_vip) group
+    voucher_count = used_voucher_count = vip_voucher_count = 0
+    for is_used, is_vip, count in db.session.execute(
+        select(Voucher.is_used, Voucher.is_vip, func.count()).group_by(Voucher.is_used, Voucher.is_vip)
+    ):
+        if is_used is False and is_vip is False:
+            voucher_count += count
+        if is_used is True:
+            used_voucher_count += count
+        if is_vip is True:
+            vip_voucher_count += count
     
     stats = {
         'prizes': prize_count,
@@ -353,6 +606,7 @@ def admin_dashboard():
 
 @app.route('/admin/prizes')
 @admin_required
+@with_db_retry
 def admin_prizes():
     """Prize management page"""
     from sqlalchemy import desc
@@ -395,9 +649,9 @@ def admin_add_prize():
         if file and file.filename and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             # Add timestamp to avoid conflicts
-            timestamp = str(int(datetime.now().timestamp()))
+            timestamp = _unique_suffix()
             filename = f"{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            file_path = _upload_path(filename)
             file.save(file_path)
             
             # Resize image if it's not SVG
@@ -408,6 +662,7 @@ def admin_add_prize():
     
     db.session.add(prize)
     db.session.commit()
+    invalidate_active_prizes()
     flash('Prize added successfully!', 'success')
     page = request.form.get('page', '1')
     return redirect(url_for('admin_prizes', page=page))
@@ -442,14 +697,14 @@ def admin_edit_prize(prize_id):
         if file and file.filename and allowed_file(file.filename):
             # Delete old icon if exists
             if prize.icon_path:
-                old_path = os.path.join(app.config['UPLOAD_FOLDER'], prize.icon_path)
+                old_path = _upload_path(prize.icon_path)
                 if os.path.exists(old_path):
                     os.remove(old_path)
             
             filename = secure_filename(file.filename)
-            timestamp = str(int(datetime.now().timestamp()))
+            timestamp = _unique_suffix()
             filename = f"{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            file_path = _upload_path(filename)
             file.save(file_path)
             
             if not filename.lower().endswith('.svg'):
@@ -458,6 +713,8 @@ def admin_edit_prize(prize_id):
             prize.icon_path = filename
     
     db.session.commit()
+    invalidate_active_prizes()
+    invalidate_winners_cache()
     flash('Prize updated successfully!', 'success')
     page = request.form.get('page', '1')
     return redirect(url_for('admin_prizes', page=page))
@@ -466,6 +723,8 @@ def admin_edit_prize(prize_id):
 @admin_required
 def admin_delete_prize(prize_id):
     """Delete prize and related records"""
+    from sqlalchemy import func, select
+    
     try:
         prize = Prize.query.get_or_404(prize_id)
         
@@ -473,29 +732,31 @@ def admin_delete_prize(prize_id):
         force_delete = request.form.get('force_delete', '0') == '1'
         
         # Check if prize is referenced by any spin results
-        spin_results = SpinResult.query.filter_by(prize_id=prize_id).all()
+        spin_results = SpinResult.query.filter_by(prize_id=prize_id)
+        spin_count = db.session.scalar(select(func.count()).select_from(SpinResult).where(SpinResult.prize_id == prize_id))
         
-        if spin_results and not force_delete:
+        if spin_count and not force_delete:
             # Return warning message with option to force delete
-            flash(f'Hadiah ini sudah digunakan dalam {len(spin_results)} history spin. Klik "Hapus Paksa" untuk menghapus hadiah beserta historynya.', 'warning')
+            flash(f'Hadiah ini sudah digunakan dalam {spin_count} history spin. Klik "Hapus Paksa" untuk menghapus hadiah beserta historynya.', 'warning')
             page = request.form.get('page', '1')
             return redirect(url_for('admin_prizes', page=page, warning_prize_id=prize_id))
         
         # Delete related spin results first if force delete
-        if spin_results:
-            for spin_result in spin_results:
-                db.session.delete(spin_result)
-            flash(f'Menghapus {len(spin_results)} history spin terkait...', 'info')
+        if spin_count:
+            spin_results.delete(synchronize_session=False)
+            flash(f'Menghapus {spin_count} history spin terkait...', 'info')
         
         # Delete icon file if exists
         if prize.icon_path:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], prize.icon_path)
+            file_path = _upload_path(prize.icon_path)
             if os.path.exists(file_path):
                 os.remove(file_path)
         
         # Delete the prize
         db.session.delete(prize)
         db.session.commit()
+        invalidate_active_prizes()
+        invalidate_winners_cache()
         flash('Hadiah berhasil dihapus!', 'success')
         
     except Exception as e:
@@ -509,13 +770,15 @@ def admin_delete_prize(prize_id):
 @admin_required
 def admin_bulk_upload_icons():
     """Bulk upload icons for existing prizes"""
+    from sqlalchemy import select, update
     try:
         updated_count = 0
         skipped_count = 0
         error_count = 0
         
-        # Get all prizes for reference
-        all_prizes = {str(prize.id): prize for prize in Prize.query.all()}
+        # Only ids and names are needed, so skip hydrating full Prize objects
+        prize_names = {str(prize_id): name for prize_id, name in db.session.execute(select(Prize.id, Prize.name))}
+        icon_updates = {}
         
         # Process each uploaded file
         for field_name in request.files:
@@ -526,11 +789,11 @@ def admin_bulk_upload_icons():
                 # Extract prize ID from field name (icon_123 -> 123)
                 prize_id = field_name.replace('icon_', '')
                 
-                if prize_id not in all_prizes:
+                if prize_id not in prize_names:
                     skipped_count += 1
                     continue
                     
-                prize = all_prizes[prize_id]
+                prize_name = prize_names[prize_id]
                 file = request.files[field_name]
                 
                 if not file or not file.filename:
@@ -538,45 +801,41 @@ def admin_bulk_upload_icons():
                     continue
                     
                 if not allowed_file(file.filename):
-                    flash(f'File untuk hadiah "{prize.name}" memiliki format yang tidak diizinkan.', 'warning')
+                    flash(f'File untuk hadiah "{prize_name}" memiliki format yang tidak diizinkan.', 'warning')
                     error_count += 1
                     continue
                 
                 # Generate unique filename
                 filename = secure_filename(file.filename)
-                timestamp = str(int(datetime.now().timestamp()))
+                timestamp = _unique_suffix()
                 filename = f"{timestamp}_{filename}"
                 
-                # Save file to temporary location first
-                temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"temp_{filename}")
-                file.save(temp_path)
-                
-                # Resize if not SVG
-                if not filename.lower().endswith('.svg'):
-                    resize_image(temp_path)
-                
-                # Use the multi-location save system
-                file_content = open(temp_path, 'rb').read()
-                save_to_storage(file_content, filename)
-                
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                # Formats that are never resized are streamed straight into storage;
+                # the rest are resized in memory and handed over as bytes
+                if _ext(filename) in UNRESIZED_EXTENSIONS:
+                    save_to_storage(file.stream, filename)
+                else:
+                    save_to_storage(resize_image_bytes(file.stream.read(), filename), filename)
                 
                 # Update prize icon path (no need to delete old file, keep for backup)
-                prize.icon_path = filename
+                icon_updates[int(prize_id)] = filename
                 updated_count += 1
                 
-                logging.info(f"Bulk upload: Updated icon for prize {prize.name} (ID: {prize.id})")
+                logging.info(f"Bulk upload: Updated icon for prize {prize_name} (ID: {prize_id})")
                 
             except Exception as e:
                 error_count += 1
                 logging.error(f"Error processing bulk upload for field {field_name}: {e}")
                 continue
         
-        # Commit all changes at once
+        # Write all icon paths in one executemany UPDATE by primary key
         if updated_count > 0:
+            db.session.execute(update(Prize), [
+                {'id': prize_id, 'icon_path': filename} for prize_id, filename in icon_updates.items()
+            ])
             db.session.commit()
+            invalidate_active_prizes()
+            invalidate_winners_cache()
             flash(f'Berhasil mengupdate {updated_count} icon hadiah!', 'success')
         
         if skipped_count > 0:
@@ -597,12 +856,30 @@ def admin_bulk_upload_icons():
 
 @app.route('/admin/vouchers')
 @admin_required
+@with_db_retry
 def admin_vouchers():
     """Voucher management page"""
     from sqlalchemy import desc
-    active_vouchers = Voucher.query.filter_by(is_used=False).order_by(desc(Voucher.created_at)).all()
-    used_vouchers = Voucher.query.filter_by(is_used=True).filter(Voucher.used_at.isnot(None)).order_by(desc(Voucher.used_at)).limit(50).all()
-    return render_template('admin/vouchers.html', active_vouchers=active_vouchers, used_vouchers=used_vouchers)
+    from sqlalchemy.orm import joinedload, raiseload, selectinload
+    page = request.args.get('page', 1, type=int)
+    per_page = 20  # Show 20 active vouchers per page
+    
+    # raiseload('*') drops the default joined guaranteed_prize, which these tables don't show, and turns
+    # any relationship a template change starts touching into an error instead of a query per row
+    active_pagination = Voucher.query.options(raiseload('*')).filter_by(is_used=False).order_by(
+        desc(Voucher.created_at), desc(Voucher.id)
+    ).paginate(page=page, per_page=per_page, error_out=False)
+    # The template lists the prizes won per used voucher, so load them in one extra query. That query
+    # keeps SpinResult's joined prize but not its joined voucher, which is the parent already loaded
+    used_vouchers = Voucher.query.options(
+        selectinload(Voucher.spin_results).options(joinedload(SpinResult.prize), raiseload('*')),
+        raiseload('*'),
+    ).filter_by(is_used=True).filter(Voucher.used_at.isnot(None)).order_by(desc(Voucher.used_at)).limit(50).all()
+    return render_template('admin/vouchers.html',
+                         active_vouchers=active_pagination.items,
+                         active_count=active_pagination.total,
+                         pagination=active_pagination,
+                         used_vouchers=used_vouchers)
 
 @app.route('/admin/vouchers/generate', methods=['POST'])
 @admin_required
@@ -620,18 +897,7 @@ def admin_generate_vouchers():
             flash('Prefix tidak boleh lebih dari 10 karakter.', 'error')
             return redirect(url_for('admin_vouchers'))
         
-        vouchers = []
-        for _ in range(count):
-            code = Voucher.generate_code_with_prefix(prefix)
-            # Ensure uniqueness
-            while Voucher.query.filter_by(code=code).first():
-                code = Voucher.generate_code_with_prefix(prefix)
-            
-            voucher = Voucher()
-            voucher.code = code
-            vouchers.append(voucher)
-        
-        db.session.add_all(vouchers)
+        Voucher.bulk_create(prefix, count)
         db.session.commit()
         flash(f'{count} voucher dengan prefix "{prefix}" berhasil dibuat!', 'success')
     except ValueError:
@@ -663,24 +929,32 @@ def admin_bulk_delete_vouchers():
         if not voucher_ids:
             return jsonify({'success': False, 'message': 'Tidak ada voucher yang dipilih'})
         
-        count = 0
-        for voucher_id in voucher_ids:
-            voucher = Voucher.query.get(voucher_id)
-            if voucher:
-                # Check type validity
-                if voucher_type == 'active' and voucher.is_used:
-                    continue  # Skip used vouchers when deleting active ones
-                elif voucher_type == 'used' and not voucher.is_used:
-                    continue  # Skip active vouchers when deleting used ones
-                
-                db.session.delete(voucher)
-                count += 1
+        # Single DELETE; vouchers of the other type are skipped, and so are
+        # vouchers still referenced by spin history (spin_result.voucher_id is NOT NULL)
+        query = Voucher.query.filter(Voucher.id.in_(voucher_ids))
+        if voucher_type == 'active':
+            query = query.filter(Voucher.is_used.isnot(True))
+        elif voucher_type == 'used':
+            query = query.filter(Voucher.is_used.is_(True))
+        kept = query.filter(Voucher.spin_results.any()).count()
+        count = query.filter(~Voucher.spin_results.any()).delete(synchronize_session=False)
         
         db.session.commit()
+        if count == 0 and kept:
+            return jsonify({
+                'success': False,
+                'message': f'{kept} voucher tidak dapat dihapus karena sudah memiliki riwayat spin',
+                'deleted_count': 0,
+                'skipped_count': kept
+            })
+        message = f'{count} voucher berhasil dihapus'
+        if kept:
+            message += f', {kept} dilewati karena sudah memiliki riwayat spin'
         return jsonify({
             'success': True, 
-            'message': f'{count} voucher berhasil dihapus',
-            'deleted_count': count
+            'message': message,
+            'deleted_count': count,
+            'skipped_count': kept
         })
         
     except Exception as e:
@@ -690,10 +964,12 @@ def admin_bulk_delete_vouchers():
 # VIP Voucher Management Routes
 @app.route('/admin/vip-vouchers')
 @admin_required
+@with_db_retry
 def admin_vip_vouchers():
     """VIP vouchers management page"""
     vip_vouchers = Voucher.query.filter_by(is_vip=True).order_by(Voucher.created_at.desc()).all()
-    prizes = Prize.query.filter_by(is_active=True).all()
+    # The prize picker only needs ids and names, which the active-prize snapshot already holds
+    prizes = get_active_prizes()['prizes']
     return render_template('admin/vip_vouchers.html', vip_vouchers=vip_vouchers, prizes=prizes)
 
 @app.route('/admin/vip-vouchers/create', methods=['POST'])
@@ -706,7 +982,7 @@ def admin_create_vip_voucher():
     guaranteed_prize_id = request.form.get('guaranteed_prize_id')
     
     # Validate prize exists
-    prize = Prize.query.get(guaranteed_prize_id)
+    prize = db.session.get(Prize, guaranteed_prize_id)
     if not prize:
         flash('Hadiah yang dipilih tidak ada!', 'error')
         return redirect(url_for('admin_vip_vouchers'))
@@ -720,11 +996,11 @@ def admin_create_vip_voucher():
     if not voucher_code:
         voucher_code = Voucher.generate_code_with_prefix(prefix)
         # Ensure uniqueness
-        while Voucher.query.filter_by(code=voucher_code).first():
+        while Voucher.get_by_code(voucher_code):
             voucher_code = Voucher.generate_code_with_prefix(prefix)
     else:
         # Check if code already exists
-        if Voucher.query.filter_by(code=voucher_code).first():
+        if Voucher.get_by_code(voucher_code):
             flash('Kode voucher sudah ada! Silakan pilih kode yang berbeda.', 'error')
             return redirect(url_for('admin_vip_vouchers'))
     
@@ -746,12 +1022,23 @@ def admin_create_vip_voucher():
 def admin_delete_vip_voucher(voucher_id):
     """Delete VIP voucher"""
     try:
-        voucher = Voucher.query.get_or_404(voucher_id)
-        if not voucher.is_vip:
-            return jsonify({'success': False, 'message': 'Not a VIP voucher'})
-        
-        db.session.delete(voucher)
+        # One filtered DELETE; the is_vip and no-spin-history checks run in SQL, not on a loaded row
+        deleted_count = Voucher.query.filter(
+            Voucher.id == voucher_id, Voucher.is_vip.is_(True), ~Voucher.spin_results.any()
+        ).delete(synchronize_session=False)
         db.session.commit()
+        
+        if not deleted_count:
+            # Nothing deleted; look the voucher up only now to say why
+            voucher = db.session.get(Voucher, voucher_id)
+            if voucher is None:
+                return jsonify({'success': False, 'message': 'VIP voucher not found'}), 404
+            if not voucher.is_vip:
+                return jsonify({'success': False, 'message': 'Not a VIP voucher'})
+            return jsonify({
+                'success': False,
+                'message': f'VIP voucher {voucher.code} sudah memiliki riwayat spin dan tidak dapat dihapus'
+            }), 409
         return jsonify({'success': True, 'message': 'VIP voucher deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -768,20 +1055,28 @@ def admin_bulk_delete_vip_vouchers():
         if not voucher_ids:
             return jsonify({'success': False, 'message': 'Tidak ada voucher yang dipilih'})
         
-        # Find and delete VIP vouchers
-        deleted_count = 0
-        for voucher_id in voucher_ids:
-            voucher = Voucher.query.get(voucher_id)
-            if voucher and voucher.is_vip:
-                db.session.delete(voucher)
-                deleted_count += 1
+        # Delete the VIP vouchers in one statement, skipping any still referenced by spin history
+        voucher_ids = [int(voucher_id) for voucher_id in voucher_ids]
+        selected = Voucher.query.filter(Voucher.id.in_(voucher_ids), Voucher.is_vip.is_(True))
+        kept_codes = [code for (code,) in selected.filter(Voucher.spin_results.any()).with_entities(Voucher.code)]
+        deleted_count = selected.filter(~Voucher.spin_results.any()).delete(synchronize_session=False)
         
         db.session.commit()
         
+        kept_note = ''
+        if kept_codes:
+            kept_note = f'{len(kept_codes)} VIP voucher tidak dihapus karena sudah memiliki riwayat spin: {", ".join(kept_codes)}'
         if deleted_count > 0:
-            return jsonify({'success': True, 'message': f'{deleted_count} VIP voucher berhasil dihapus'})
+            message = f'{deleted_count} VIP voucher berhasil dihapus'
+            if kept_note:
+                message += f'. {kept_note}'
+            return jsonify({'success': True, 'message': message, 'kept_codes': kept_codes})
         else:
-            return jsonify({'success': False, 'message': 'Tidak ada VIP voucher yang valid untuk dihapus.'})
+            return jsonify({
+                'success': False,
+                'message': kept_note or 'Tidak ada VIP voucher yang valid untuk dihapus.',
+                'kept_codes': kept_codes
+            })
             
     except Exception as e:
         db.session.rollback()
@@ -789,17 +1084,33 @@ def admin_bulk_delete_vip_vouchers():
 
 @app.route('/admin/winners')
 @admin_required
+@with_db_retry
 def admin_winners():
     """Winners tracking page"""
     from sqlalchemy import desc
-    # Get all spin results with prize and voucher information
-    winners = db.session.query(SpinResult, Prize, Voucher).join(
+    page = request.args.get('page', 1, type=int)
+    per_page = 100  # Show 100 winners per page
+    
+    # Select only the columns the table shows; no ORM objects are built per row
+    winners_pagination = db.session.query(
+        SpinResult.id, SpinResult.username, SpinResult.spun_at,
+        Prize.name, Prize.icon_path, Prize.probability, Voucher.code,
+    ).join(
         Prize, SpinResult.prize_id == Prize.id
     ).join(
         Voucher, SpinResult.voucher_id == Voucher.id
-    ).order_by(desc(SpinResult.spun_at)).limit(100).all()
+    ).order_by(desc(SpinResult.spun_at), desc(SpinResult.id)).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
     
-    return render_template('admin/winners.html', winners=winners)
+    # Transform data for template: (spin_result, prize, voucher) per row
+    winners = [(
+        {'id': spin_id, 'username': username, 'spun_at': spun_at},
+        {'name': prize_name, 'icon_path': icon_path, 'probability': probability},
+        {'code': voucher_code}
+    ) for spin_id, username, spun_at, prize_name, icon_path, probability, voucher_code in winners_pagination.items]
+    
+    return render_template('admin/winners.html', winners=winners, pagination=winners_pagination)
 
 @app.route('/admin/winners/delete', methods=['POST'])
 @admin_required
@@ -812,15 +1123,12 @@ def admin_delete_winners():
         return redirect(url_for('admin_winners'))
     
     try:
-        # Delete selected spin results
-        count = 0
-        for winner_id in winner_ids:
-            spin_result = SpinResult.query.get(winner_id)
-            if spin_result:
-                db.session.delete(spin_result)
-                count += 1
+        # Delete selected spin results in one statement
+        winner_ids = [int(winner_id) for winner_id in winner_ids]
+        count = SpinResult.query.filter(SpinResult.id.in_(winner_ids)).delete(synchronize_session=False)
         
         db.session.commit()
+        invalidate_winners_cache()
         flash(f'{count} history pemenang berhasil dihapus!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -830,27 +1138,37 @@ def admin_delete_winners():
 
 @app.route('/admin/history')
 @admin_required
+@with_db_retry
 def admin_history():
     """View spin history"""
     from sqlalchemy import desc
-    spin_results = db.session.query(SpinResult, Prize, Voucher).join(
+    page = request.args.get('page', 1, type=int)
+    per_page = 50  # Show 50 spins per page
+    
+    # Select only the columns the table shows; no ORM objects are built per row
+    history_pagination = db.session.query(
+        SpinResult.id, SpinResult.spun_at, SpinResult.username, Voucher.code,
+        Prize.name, Prize.icon_path,
+    ).join(
         Prize, SpinResult.prize_id == Prize.id
     ).join(
         Voucher, SpinResult.voucher_id == Voucher.id
-    ).order_by(desc(SpinResult.spun_at)).all()
+    ).order_by(desc(SpinResult.spun_at), desc(SpinResult.id)).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
     
     # Transform data for template
-    history_data = []
-    for spin_result, prize, voucher in spin_results:
-        history_data.append({
-            'id': spin_result.id,
-            'created_at': spin_result.spun_at,
-            'username': spin_result.username,
-            'voucher_code': voucher.code,
-            'prize': prize
-        })
-    
-    return render_template('admin/history.html', spin_results=history_data)
+    history_data = [{
+        'id': spin_id,
+        'created_at': spun_at,
+        'username': username,
+        'voucher_code': voucher_code,
+        'prize': {'name': prize_name, 'icon_path': icon_path}
+    } for spin_id, spun_at, username, voucher_code, prize_name, icon_path in history_pagination.items]
+    
+    return render_template('admin/history.html',
+                         spin_results=history_data,
+                         pagination=history_pagination)
 
 @app.route('/admin/history/delete', methods=['POST'])
 @admin_required
@@ -863,14 +1181,11 @@ def admin_delete_history():
         if not ids:
             return jsonify({'success': False, 'message': 'No IDs provided'})
         
-        count = 0
-        for history_id in ids:
-            spin_result = SpinResult.query.get(history_id)
-            if spin_result:
-                db.session.delete(spin_result)
-                count += 1
+        ids = [int(history_id) for history_id in ids]
+        count = SpinResult.query.filter(SpinResult.id.in_(ids)).delete(synchronize_session=False)
         
         db.session.commit()
+        invalidate_winners_cache()
         return jsonify({'success': True, 'message': f'{count} history entries deleted'})
     
     except Exception as e:
@@ -882,9 +1197,10 @@ def admin_delete_history():
 def admin_clear_history():
     """Clear all history"""
     try:
-        count = SpinResult.query.count()
-        SpinResult.query.delete()
+        # The DELETE's rowcount is the number cleared; no separate COUNT(*) round-trip
+        count = SpinResult.query.delete(synchronize_session=False)
         db.session.commit()
+        invalidate_winners_cache()
         flash(f'{count} history entries cleared successfully!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -894,6 +1210,7 @@ def admin_clear_history():
 
 @app.route('/admin/settings')
 @admin_required
+@with_db_retry
 def admin_settings():
     """Wheel settings page"""
     settings = WheelSettings.get_settings()
@@ -901,6 +1218,7 @@ def admin_settings():
 
 @app.route('/admin/account-settings')
 @admin_required
+@with_db_retry
 def admin_account_settings():
     """Account settings page"""
     settings = WheelSettings.get_settings()
@@ -929,56 +1247,35 @@ def admin_update_logo():
         return redirect(url_for('admin_account_settings'))
     
     # Validasi file
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
-    if not file.filename or not ('.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in allowed_extensions):
+    if not file.filename or _ext(file.filename) not in LOGO_EXTENSIONS:
         flash('Format file tidak didukung! Gunakan PNG, JPG, JPEG, atau GIF.', 'error')
         return redirect(url_for('admin_account_settings'))
     
     try:
         # Simpan file
         filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        filename = timestamp + filename
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        timestamp = _unique_suffix()
+        filename = f"logo_{timestamp}_{filename}"
+        file_path = _upload_path(filename)
         
         # Buat direktori jika belum ada
         os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
         
-        # Resize dan simpan gambar
-        from PIL import Image
-        import shutil
-        
-        # Save file first then open it
-        file.save(file_path)
-        
-        # Create backup copy in static folder for better persistence
-        static_backup_path = os.path.join('static', 'uploads', filename)
-        os.makedirs(os.path.dirname(static_backup_path), exist_ok=True)
-        shutil.copy2(file_path, static_backup_path)
-        
-        image = Image.open(file_path)
-        
-        # Convert RGBA to RGB if necessary
-        if image.mode == 'RGBA':
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        
-        # Resize logo ke ukuran maksimal 300x300 sambil mempertahankan aspect ratio
-        image.thumbnail((300, 300), Image.Resampling.LANCZOS)
-        image.save(file_path, optimize=True, quality=90)
+        # Decode straight from the upload stream; only the final image touches disk
+        process_logo(file.stream, file_path, filename)
         
         # Update database
         settings = WheelSettings.get_settings()
         
         # Hapus logo lama jika ada
         if settings.logo_path:
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.logo_path)
+            old_path = _upload_path(settings.logo_path)
             if os.path.exists(old_path):
                 os.remove(old_path)
         
         settings.logo_path = filename
         db.session.commit()
+        invalidate_settings_cache()
         
         flash('Logo berhasil diupdate!', 'success')
         
@@ -1004,13 +1301,14 @@ def admin_remove_logo():
         
         if settings.logo_path:
             # Hapus file logo
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.logo_path)
+            old_path = _upload_path(settings.logo_path)
             if os.path.exists(old_path):
                 os.remove(old_path)
             
             # Update database
             settings.logo_path = None
             db.session.commit()
+            invalidate_settings_cache()
             
             flash('Logo berhasil dihapus!', 'success')
         else:
@@ -1044,6 +1342,7 @@ def admin_update_app_text():
         settings.description_text = description_text if description_text else 'Masukkan kode voucher Anda dan putar untuk memenangkan hadiah menarik!'
         
         db.session.commit()
+        invalidate_settings_cache()
         flash('Teks aplikasi berhasil diupdate!', 'success')
         
     except Exception as e:
@@ -1051,77 +1350,55 @@ def admin_update_app_text():
     
     return redirect(url_for('admin_account_settings'))
 
+# Columns of WheelSettings edited as plain values on the settings form
+SETTINGS_TEXT_FIELDS = (
+    'title_text', 'description_text', 'description_color', 'back_to_site_url', 'back_to_site_text',
+    'wheel_color_1', 'wheel_color_2', 'text_color', 'border_color',
+    'input_bg_color', 'input_text_color', 'button_bg_color', 'button_text_color',
+    'popup_title', 'popup_description', 'popup_link_url', 'popup_link_text',
+    'glow_color', 'center_button_bg_color', 'center_button_text_color',
+    'back_button_bg_color', 'back_button_text_color',
+    'prize_border_color', 'prize_border_gradient_start', 'prize_border_gradient_end',
+    'container_bg_color',
+)
+SETTINGS_INT_FIELDS = ('description_font_size', 'glow_intensity')
+
 @app.route('/admin/settings/update', methods=['POST'])
 @admin_required
 def admin_update_settings():
     """Update wheel settings"""
     settings = WheelSettings.get_settings()
     
-    # Update text customization
-    settings.title_text = request.form.get('title_text', settings.title_text or 'Lucky Spin Wheel')
-    settings.description_text = request.form.get('description_text', settings.description_text or 'Masukkan kode voucher Anda dan putar untuk memenangkan hadiah menarik!')
-    settings.description_font_size = int(request.form.get('description_font_size', settings.description_font_size or 18))
-    settings.description_color = request.form.get('description_color', settings.description_color or '#ffffff')
-    settings.back_to_site_url = request.form.get('back_to_site_url', settings.back_to_site_url)
-    settings.back_to_site_text = request.form.get('back_to_site_text', settings.back_to_site_text or 'Kembali ke Situs')
-    
-    # Update colors
-    settings.wheel_color_1 = request.form.get('wheel_color_1', settings.wheel_color_1)
-    settings.wheel_color_2 = request.form.get('wheel_color_2', settings.wheel_color_2)
-    settings.text_color = request.form.get('text_color', settings.text_color)
-    settings.border_color = request.form.get('border_color', settings.border_color)
-    
-    # Update input and button colors
-    settings.input_bg_color = request.form.get('input_bg_color', settings.input_bg_color or '#ffffff')
-    settings.input_text_color = request.form.get('input_text_color', settings.input_text_color or '#000000')
-    settings.button_bg_color = request.form.get('button_bg_color', settings.button_bg_color or '#ffc107')
-    settings.button_text_color = request.form.get('button_text_color', settings.button_text_color or '#000000')
-    
-    # Update popup settings
-    settings.popup_enabled = bool(request.form.get('popup_enabled'))
-    settings.popup_title = request.form.get('popup_title', settings.popup_title or 'Selamat!')
-    settings.popup_description = request.form.get('popup_description', settings.popup_description)
-    settings.popup_link_url = request.form.get('popup_link_url', settings.popup_link_url)
-    settings.popup_link_text = request.form.get('popup_link_text', settings.popup_link_text or 'Kunjungi Sekarang')
-    
-    # Update glow settings
-    settings.glow_enabled = bool(request.form.get('glow_enabled', True))
-    settings.glow_color = request.form.get('glow_color', settings.glow_color or '#FF6B6B')
-    settings.glow_intensity = int(request.form.get('glow_intensity', settings.glow_intensity or 50))
-    
-    # Update center button settings
-    settings.center_button_bg_color = request.form.get('center_button_bg_color', settings.center_button_bg_color or '#ffd700')
-    settings.center_button_text_color = request.form.get('center_button_text_color', settings.center_button_text_color or '#000000')
-    
-    # Update back button settings
-    settings.back_button_bg_color = request.form.get('back_button_bg_color', settings.back_button_bg_color or '#007bff')
-    settings.back_button_text_color = request.form.get('back_button_text_color', settings.back_button_text_color or '#ffffff')
-    
-    # Update prize border settings
-    settings.prize_border_color = request.form.get('prize_border_color', settings.prize_border_color or '#ffffff')
-    settings.prize_border_gradient_start = request.form.get('prize_border_gradient_start', settings.prize_border_gradient_start or '#ff0000')
-    settings.prize_border_gradient_end = request.form.get('prize_border_gradient_end', settings.prize_border_gradient_end or '#9400d3')
-    
-    # Update container settings
-    settings.container_bg_color = request.form.get('container_bg_color', settings.container_bg_color or '#1a1a2e')
+    # Copy the form onto the row, assigning only the columns whose value actually changed so an
+    # unchanged form leaves the row clean (no UPDATE, no cache invalidation) and a concurrent edit
+    # of a column this form didn't change isn't overwritten with the old value
+    incoming = {}
+    for column in SETTINGS_TEXT_FIELDS:
+        current = getattr(settings, column)
+        incoming[column] = request.form.get(column, current or THEME_DEFAULTS.get(column, current))
+    for column in SETTINGS_INT_FIELDS:
+        incoming[column] = int(request.form.get(column, getattr(settings, column) or THEME_DEFAULTS[column]))
+    incoming['popup_enabled'] = bool(request.form.get('popup_enabled'))
+    incoming['glow_enabled'] = bool(request.form.get('glow_enabled', True))
+    
+    for column, value in incoming.items():
+        if getattr(settings, column) != value:
+            setattr(settings, column, value)
     
     # Handle logo upload
     if 'logo' in request.files:
         file = request.files['logo']
         if file and file.filename and allowed_file(file.filename):
             if settings.logo_path:
-                old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.logo_path)
+                old_path = _upload_path(settings.logo_path)
                 if os.path.exists(old_path):
                     os.remove(old_path)
             
             filename = secure_filename(file.filename)
-            timestamp = str(int(datetime.now().timestamp()))
+            timestamp = _unique_suffix()
             filename = f"logo_{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            
-            if not filename.lower().endswith('.svg'):
-                resize_image(file_path, (200, 200))
+            file_path = _upload_path(filename)
+            save_resized_upload(file, file_path, (200, 200))
             
             settings.logo_path = filename
     
@@ -1130,18 +1407,15 @@ def admin_update_settings():
         file = request.files['background']
         if file and file.filename and allowed_file(file.filename):
             if settings.background_path:
-                old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.background_path)
+                old_path = _upload_path(settings.background_path)
                 if os.path.exists(old_path):
                     os.remove(old_path)
             
             filename = secure_filename(file.filename)
-            timestamp = str(int(datetime.now().timestamp()))
+            timestamp = _unique_suffix()
             filename = f"bg_{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            
-            if not filename.lower().endswith('.svg'):
-                resize_image(file_path, (1200, 800))
+            file_path = _upload_path(filename)
+            save_resized_upload(file, file_path, (1200, 800))
             
             settings.background_path = filename
     
@@ -1150,18 +1424,15 @@ def admin_update_settings():
         file = request.files['popup_image']
         if file and file.filename and allowed_file(file.filename):
             if settings.popup_image_path:
-                old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.popup_image_path)
+                old_path = _upload_path(settings.popup_image_path)
                 if os.path.exists(old_path):
                     os.remove(old_path)
             
             filename = secure_filename(file.filename)
-            timestamp = str(int(datetime.now().timestamp()))
+            timestamp = _unique_suffix()
             filename = f"popup_{timestamp}_{filename}"
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            
-            if not filename.lower().endswith('.svg'):
-                resize_image(file_path, (400, 300))
+            file_path = _upload_path(filename)
+            save_resized_upload(file, file_path, (400, 300))
             
             settings.popup_image_path = filename
     
@@ -1170,23 +1441,19 @@ def admin_update_settings():
         file = request.files['background_music']
         if file and file.filename and allowed_audio_file(file.filename):
             # Check file size (max 50MB)
-            file.seek(0, 2)  # Seek to end of file
-            file_size = file.tell()
-            file.seek(0)  # Reset to beginning
-            
-            if file_size > 50 * 1024 * 1024:  # 50MB limit
+            if _exceeds_upload_limit(file, 50 * 1024 * 1024):
                 flash('File musik terlalu besar. Maksimum 50MB.', 'error')
             else:
                 # Remove old music file if exists
                 if settings.music_path:
-                    old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.music_path)
+                    old_path = _upload_path(settings.music_path)
                     if os.path.exists(old_path):
                         os.remove(old_path)
                 
                 filename = secure_filename(file.filename)
-                timestamp = str(int(datetime.now().timestamp()))
+                timestamp = _unique_suffix()
                 filename = f"music_{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                file_path = _upload_path(filename)
                 file.save(file_path)
                 
                 settings.music_path = filename
@@ -1197,107 +1464,98 @@ def admin_update_settings():
         file = request.files['spin_sound']
         if file and file.filename and allowed_audio_file(file.filename):
             # Check file size (max 10MB)
-            file.seek(0, 2)  # Seek to end of file
-            file_size = file.tell()
-            file.seek(0)  # Reset to beginning
-            
-            if file_size > 10 * 1024 * 1024:  # 10MB limit
+            if _exceeds_upload_limit(file, 10 * 1024 * 1024):
                 flash('File spin sound terlalu besar. Maksimum 10MB.', 'error')
             else:
                 # Remove old spin sound file if exists
                 if settings.spin_sound_path:
-                    old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.spin_sound_path)
+                    old_path = _upload_path(settings.spin_sound_path)
                     if os.path.exists(old_path):
                         os.remove(old_path)
                 
                 filename = secure_filename(file.filename)
-                timestamp = str(int(datetime.now().timestamp()))
+                timestamp = _unique_suffix()
                 filename = f"spin_{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                file_path = _upload_path(filename)
                 file.save(file_path)
                 
                 settings.spin_sound_path = filename
                 flash('File spin sound berhasil diupload!', 'success')
     
     db.session.commit()
+    invalidate_settings_cache()
     flash('Settings updated successfully!', 'success')
     return redirect(url_for('admin_settings'))
 
+# /admin/remove-image types and the WheelSettings column holding each file
+REMOVABLE_UPLOAD_COLUMNS = {
+    'logo': 'logo_path',
+    'background': 'background_path',
+    'popup_image': 'popup_image_path',
+    'music': 'music_path',
+    'spin_sound': 'spin_sound_path',
+}
+
 @app.route('/admin/remove-image', methods=['POST'])
 @admin_required
 def admin_remove_image():
     """Remove uploaded images"""
+    from sqlalchemy import update
+    
     try:
-        import os
         data = request.get_json()
-        image_type = data.get('type')
+        column = REMOVABLE_UPLOAD_COLUMNS.get(data.get('type'))
         
         settings = WheelSettings.get_settings()
+        current = getattr(settings, column) if column else None
         
-        if image_type == 'logo' and settings.logo_path:
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.logo_path)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-            settings.logo_path = None
-            
-        elif image_type == 'background' and settings.background_path:
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.background_path)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-            settings.background_path = None
-            
-        elif image_type == 'popup_image' and settings.popup_image_path:
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.popup_image_path)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-            settings.popup_image_path = None
-            
-        elif image_type == 'music' and settings.music_path:
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.music_path)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-            settings.music_path = None
+        if current:
+            try:
+                os.remove(_upload_path(current))
+            except FileNotFoundError:
+                pass
             
-        elif image_type == 'spin_sound' and settings.spin_sound_path:
-            old_path = os.path.join(app.config['UPLOAD_FOLDER'], settings.spin_sound_path)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-            settings.spin_sound_path = None
-        
-        db.session.commit()
+            # One UPDATE of the single column; bulk UPDATEs skip the mapper events, so drop the cache here
+            db.session.execute(
+                update(WheelSettings).where(WheelSettings.id == settings.id).values({column: None}),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            invalidate_settings_cache()
         return jsonify({'success': True, 'message': 'File removed successfully'})
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': str(e)})
 
+# Upload names are not guaranteed write-once, so clients revalidate (ETag/Last-Modified) after an hour
+UPLOAD_CACHE_MAX_AGE = 3600
+
 # File serving route
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    """Serve uploaded files from Object Storage with fallback"""
+    """Serve uploaded files from disk, falling back to Object Storage and backups"""
+    # In production nginx should serve /uploads/ directly, bypassing Flask.
+    try:
+        # Fast path: local disk via send_file (sendfile, ETag/Last-Modified, 304 revalidation)
+        return send_from_directory(app.config['UPLOAD_FOLDER'], filename, conditional=True,
+                                   max_age=UPLOAD_CACHE_MAX_AGE)
+    except NotFound:
+        pass
+    
     try:
         # Get file content from storage (Object Storage first, then fallback)
         file_content = get_from_storage(filename)
         
         if file_content:
             # Determine MIME type based on file extension
-            ext = filename.lower().split('.')[-1]
-            mime_types = {
-                'png': 'image/png', 'jpg': 'image/jpeg', 'jpeg': 'image/jpeg',
-                'gif': 'image/gif', 'svg': 'image/svg+xml', 'webp': 'image/webp',
-                'bmp': 'image/bmp', 'ico': 'image/x-icon',
-                'mp3': 'audio/mpeg', 'wav': 'audio/wav', 'ogg': 'audio/ogg',
-                'm4a': 'audio/mp4', 'aac': 'audio/aac', 'flac': 'audio/flac',
-                'wma': 'audio/x-ms-wma', 'opus': 'audio/opus'
-            }
-            
-            mime_type = mime_types.get(ext, 'application/octet-stream')
+            mime_type = MIME_TYPES.get(_ext(filename), 'application/octet-stream')
             
             # Return file content as HTTP response
             return Response(
                 file_content,
                 mimetype=mime_type,
-                headers={"Cache-Control": "public, max-age=3600"}
+                headers={"Cache-Control": f"public, max-age={UPLOAD_CACHE_MAX_AGE}"}
             )
         
         # File not found anywhere
@@ -1310,18 +1568,43 @@ def uploaded_file(filename):
 
 # ====== MOBILE API ENDPOINTS ======
 
+# Fixed body for unexpected API failures; exception text stays in the log, not the response
+API_ERROR_BODY = b'{"success": false, "error": "internal_error"}'
+
+def _api_error():
+    """Log the exception being handled and return the generic API 500 response"""
+    logging.exception(f"API error on {request.path}")
+    return Response(API_ERROR_BODY, status=500, mimetype='application/json')
+
+# Absolute uploads URL per request host_url (scheme, host and script root)
+_upload_url_prefixes = {}
+
+def _upload_url_prefix():
+    """Absolute URL of the uploads route, built once per host and joined with quoted names"""
+    host = request.host_url
+    prefix = _upload_url_prefixes.get(host)
+    if prefix is None:
+        if len(_upload_url_prefixes) >= 16:
+            # Bound the memo against spoofed Host headers
+            _upload_url_prefixes.clear()
+        prefix = _upload_url_prefixes[host] = url_for('uploaded_file', filename='', _external=True)
+    return prefix
+
 @app.route('/api/v1/prizes', methods=['GET'])
 def api_get_prizes():
     """Get all active prizes for mobile app"""
     try:
-        prizes = Prize.query.filter_by(is_active=True).all()
+        # The cached wheel snapshot already holds each prize's to_dict(); no query or ORM rows needed
+        prizes = get_active_prizes()['prizes']
         prizes_data = []
+        upload_url = _upload_url_prefix()
         
         for prize in prizes:
-            prize_dict = prize.to_dict()
+            # Copy: the snapshot dicts are shared across requests
+            prize_dict = dict(prize)
             # Add full URL for icon if exists
-            if prize.icon_path:
-                prize_dict['icon_url'] = url_for('uploaded_file', filename=prize.icon_path, _external=True)
+            if prize['icon_path']:
+                prize_dict['icon_url'] = upload_url + quote(prize['icon_path'])
             prizes_data.append(prize_dict)
         
         return jsonify({
@@ -1329,11 +1612,8 @@ def api_get_prizes():
             'data': prizes_data,
             'count': len(prizes_data)
         })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    except Exception:
+        return _api_error()
 
 @app.route('/api/v1/voucher/validate', methods=['POST'])
 def api_validate_voucher():
@@ -1348,9 +1628,9 @@ def api_validate_voucher():
                 'error': 'Voucher code is required'
             }), 400
         
-        voucher = Voucher.query.filter_by(code=voucher_code, is_used=False).first()
+        voucher = Voucher.get_by_code(voucher_code)
         
-        if not voucher:
+        if not voucher or voucher.is_used:
             return jsonify({
                 'success': False,
                 'error': 'Invalid or already used voucher code',
@@ -1366,7 +1646,7 @@ def api_validate_voucher():
         }
         
         if voucher.is_vip and voucher.guaranteed_prize_id:
-            prize = Prize.query.get(voucher.guaranteed_prize_id)
+            prize = db.session.get(Prize, voucher.guaranteed_prize_id)
             if prize:
                 voucher_data['guaranteed_prize'] = prize.to_dict()
         
@@ -1376,15 +1656,14 @@ def api_validate_voucher():
             'data': voucher_data
         })
         
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    except Exception:
+        return _api_error()
 
 @app.route('/api/v1/spin', methods=['POST'])
 def api_spin_wheel():
     """Spin wheel API for mobile app"""
+    from sqlalchemy import insert
+    
     try:
         data = request.get_json()
         voucher_code = data.get('voucher_code', '').strip().upper()
@@ -1395,17 +1674,20 @@ def api_spin_wheel():
                 'error': 'Voucher code is required'
             }), 400
         
-        # Validate voucher
-        voucher = Voucher.query.filter_by(code=voucher_code, is_used=False).first()
-        if not voucher:
+        # Claim the voucher in one conditional UPDATE so concurrent spins on a code can't both win;
+        # the claim is rolled back below if no prize can be awarded
+        voucher = Voucher.claim(voucher_code)
+        if voucher is None:
             return jsonify({
                 'success': False,
                 'error': 'Invalid or already used voucher code'
             }), 400
         
-        # Get active prizes
-        prizes = Prize.query.filter_by(is_active=True).all()
+        # Get active prizes (cached wheel snapshot, shared with the web spin)
+        active_prizes = get_active_prizes()
+        prizes = active_prizes['prizes']
         if not prizes:
+            db.session.rollback()
             return jsonify({
                 'success': False,
                 'error': 'No prizes available'
@@ -1413,77 +1695,63 @@ def api_spin_wheel():
         
         # Check if VIP voucher with guaranteed prize
         if voucher.is_vip and voucher.guaranteed_prize_id:
-            winner = Prize.query.get(voucher.guaranteed_prize_id)
-            if not winner or not winner.is_active:
+            # Only active prizes are in the snapshot, so a miss means the prize was disabled or removed
+            winner_index = active_prizes['index_by_id'].get(voucher.guaranteed_prize_id)
+            if winner_index is None:
+                db.session.rollback()
                 return jsonify({
                     'success': False,
                     'error': 'VIP prize is no longer available'
                 }), 400
         else:
             # Regular probability system
-            weights = [prize.probability for prize in prizes]
-            total_weight = sum(weights)
+            total_weight = active_prizes['total_weight']
             
             if total_weight <= 0:
+                db.session.rollback()
                 return jsonify({
                     'success': False,
                     'error': 'No prizes with valid probabilities'
                 }), 400
             
             # Select winner based on probability
-            rand_val = random.uniform(0, total_weight)
-            cumulative = 0
-            winner = None
-            
-            for prize in prizes:
-                cumulative += prize.probability
-                if rand_val <= cumulative:
-                    winner = prize
-                    break
-            
-            if not winner:
-                winner = prizes[-1]
+            winner_index = _draw_prize_index(active_prizes['cum_weights'], total_weight)
         
-        # Mark voucher as used
-        voucher.mark_used()
+        winner = prizes[winner_index]
         
         # Record spin result
-        spin_result = SpinResult()
-        spin_result.voucher_id = voucher.id
-        spin_result.prize_id = winner.id
-        db.session.add(spin_result)
+        spin_id = db.session.execute(
+            insert(SpinResult).values(voucher_id=voucher.id, prize_id=winner['id']).returning(SpinResult.id)
+        ).scalar_one()
         db.session.commit()
+        invalidate_winners_cache()
         
         # Calculate rotation for animation
-        prize_count = len(prizes)
-        segment_angle = 360 / prize_count
-        winner_index = next(i for i, p in enumerate(prizes) if p.id == winner.id)
+        segment_angle = active_prizes['segment_angle']
         
-        base_rotations = random.randint(5, 8) * 360
-        winner_angle = winner_index * segment_angle + (segment_angle / 2)
+        base_rotations = _rng().randint(5, 8) * 360
+        winner_angle = (winner_index + 0.5) * segment_angle
         final_angle = base_rotations + (360 - winner_angle)
         
-        winner_data = winner.to_dict()
-        if winner.icon_path:
-            winner_data['icon_url'] = url_for('uploaded_file', filename=winner.icon_path, _external=True)
+        # Copy: the snapshot dicts are shared across requests
+        winner_data = dict(winner)
+        if winner['icon_path']:
+            winner_data['icon_url'] = url_for('uploaded_file', filename=winner['icon_path'], _external=True)
         
         return jsonify({
             'success': True,
             'data': {
                 'prize': winner_data,
                 'rotation': final_angle,
-                'spin_id': spin_result.id,
+                'spin_id': spin_id,
                 'voucher_code': voucher_code,
                 'is_vip': voucher.is_vip
             }
         })
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        return _api_error()
 
 @app.route('/api/v1/save-winner', methods=['POST'])
 def api_save_winner():
@@ -1499,68 +1767,165 @@ def api_save_winner():
                 'error': 'Spin ID and username are required'
             }), 400
         
-        spin_result = SpinResult.query.get(spin_id)
-        if not spin_result:
+        if not _set_spin_username(spin_id, username):
             return jsonify({
                 'success': False,
                 'error': 'Spin result not found'
             }), 404
-        
-        spin_result.username = username
         db.session.commit()
+        invalidate_winners_cache()
         
         return jsonify({
             'success': True,
             'message': 'Winner saved successfully'
         })
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        return _api_error()
+
+# Seconds a worker may serve the winners feed from memory; spins and winner edits drop it sooner
+WINNERS_CACHE_TTL = 10
+
+# Largest page /api/v1/winners returns; ?limit= is clamped to 1..WINNERS_MAX_LIMIT
+WINNERS_MAX_LIMIT = 100
+
+# Serialized /api/v1/winners bodies as (limit, host) -> (expires, payload)
+_winners_api_cache = {'entries': {}}
+
+def invalidate_winners_cache():
+    """Drop the cached winners feed so the next read queries again"""
+    _winners_api_cache['entries'] = {}
+
+def _winner_prize_view(prize_id, name, icon_path, probability, is_active, upload_url):
+    """Build the prize object embedded in each winners feed entry"""
+    view = {
+        'id': prize_id,
+        'name': name,
+        'icon_path': icon_path,
+        'probability': probability,
+        'is_active': is_active
+    }
+    if icon_path:
+        view['icon_url'] = upload_url + quote(icon_path)
+    return view
 
 @app.route('/api/v1/winners', methods=['GET'])
 def api_get_winners():
     """Get recent winners for mobile app"""
     try:
-        from sqlalchemy import desc
-        limit = request.args.get('limit', 10, type=int)
-        
-        winners = db.session.query(SpinResult, Prize, Voucher).join(
+        from sqlalchemy import and_, desc, or_, select
+        from sqlalchemy.orm import aliased
+        limit = max(1, min(request.args.get('limit', 10, type=int), WINNERS_MAX_LIMIT))
+        before_id = request.args.get('before_id', type=int)
+        
+        key = (limit, before_id, request.host_url)
+        entry = _winners_api_cache['entries'].get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return Response(entry[1], mimetype='application/json')
+        
+        # Select only the columns the response needs; no ORM objects are built per row
+        query = select(
+            SpinResult.id, SpinResult.username, SpinResult.spun_at, Voucher.code, Voucher.is_vip,
+            Prize.id, Prize.name, Prize.icon_path, Prize.probability, Prize.is_active,
+        ).join(
             Prize, SpinResult.prize_id == Prize.id
         ).join(
             Voucher, SpinResult.voucher_id == Voucher.id
-        ).order_by(desc(SpinResult.spun_at)).limit(limit).all()
+        )
+        
+        if before_id is not None:
+            # Keyset pagination: seek past the (spun_at, id) of the cursor row on the index instead
+            # of OFFSET, so deep pages cost the same as the first one. The cursor's spun_at is read
+            # in SQL rather than sent back by the client, so the comparison never depends on how
+            # the dialect stores or binds datetimes. The cursor row needs a non-NULL spun_at (every
+            # spin gets one via the column default); a NULL compares false and ends the listing
+            cursor_row = aliased(SpinResult)
+            cursor_at = select(cursor_row.spun_at).where(cursor_row.id == before_id).scalar_subquery()
+            query = query.where(or_(
+                SpinResult.spun_at < cursor_at,
+                and_(SpinResult.spun_at == cursor_at, SpinResult.id < before_id),
+            ))
+        
+        winners = db.session.execute(
+            query.order_by(desc(SpinResult.spun_at), desc(SpinResult.id)).limit(limit)
+        ).all()
         
         winners_data = []
-        for spin_result, prize, voucher in winners:
-            winner_dict = {
-                'id': spin_result.id,
-                'username': spin_result.username,
-                'prize': prize.to_dict(),
-                'voucher_code': voucher.code,
-                'is_vip': voucher.is_vip,
-                'spun_at': spin_result.spun_at.isoformat() if spin_result.spun_at else None
-            }
-            
-            if prize.icon_path:
-                winner_dict['prize']['icon_url'] = url_for('uploaded_file', filename=prize.icon_path, _external=True)
-            
-            winners_data.append(winner_dict)
+        upload_url = _upload_url_prefix()
+        # A handful of prizes repeat across the feed, so each prize view is built once
+        prize_views = {}
+        for (spin_id, username, spun_at, voucher_code, is_vip,
+             prize_id, prize_name, icon_path, probability, is_active) in winners:
+            prize_view = prize_views.get(prize_id)
+            if prize_view is None:
+                prize_view = prize_views[prize_id] = _winner_prize_view(
+                    prize_id, prize_name, icon_path, probability, is_active, upload_url)
+            winners_data.append({
+                'id': spin_id,
+                'username': username,
+                'prize': prize_view,
+                'voucher_code': voucher_code,
+                'is_vip': is_vip,
+                'spun_at': spun_at.isoformat() if spun_at else None
+            })
         
-        return jsonify({
+        # Cursor for the next page; None once the feed is exhausted
+        next_cursor = None
+        if winners and len(winners) == limit:
+            next_cursor = {'before_id': winners[-1][0]}
+        
+        payload = app.json.dumps({
             'success': True,
             'data': winners_data,
-            'count': len(winners_data)
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+            'count': len(winners_data),
+            'next_cursor': next_cursor
+        }).encode()
+        entries = _winners_api_cache['entries']
+        if len(entries) >= 64:
+            # Bound the cache against arbitrary ?limit= values
+            entries = _winners_api_cache['entries'] = {}
+        entries[key] = (time.monotonic() + WINNERS_CACHE_TTL, payload)
+        return Response(payload, mimetype='application/json')
+        
+    except Exception:
+        return _api_error()
+
+# Serialized /api/v1/settings body as (key, payload, etag), swapped in as one tuple
+_settings_api_cache = {'entry': None}
+
+def _build_settings_payload(settings):
+    """Serialize the settings API response once, returning the body and its ETag"""
+    settings_data = {
+        'wheel_title': settings.title_text,
+        'description': settings.description_text,
+        'popup_enabled': settings.popup_enabled,
+        'popup_title': settings.popup_title,
+        'popup_message': settings.popup_description,
+        'wheel_colors': [settings.wheel_color_1, settings.wheel_color_2],
+        'text_color': settings.text_color,
+        'updated_at': settings.updated_at.isoformat() if settings.updated_at else None
+    }
+    
+    # Add URLs for assets
+    upload_url = _upload_url_prefix()
+    if settings.logo_path:
+        settings_data['logo_url'] = upload_url + quote(settings.logo_path)
+    
+    if settings.background_path:
+        settings_data['background_url'] = upload_url + quote(settings.background_path)
+    
+    if settings.popup_image_path:
+        settings_data['popup_image_url'] = upload_url + quote(settings.popup_image_path)
+    
+    if settings.music_path:
+        settings_data['music_url'] = upload_url + quote(settings.music_path)
+    
+    payload = app.json.dumps({
+        'success': True,
+        'data': settings_data
+    }).encode()
+    return payload, hashlib.sha1(payload).hexdigest()
 
 @app.route('/api/v1/settings', methods=['GET'])
 def api_get_settings():
@@ -1568,77 +1933,88 @@ def api_get_settings():
     try:
         settings = WheelSettings.get_settings()
         
-        settings_data = {
-            'wheel_title': settings.wheel_title,
-            'winning_message': settings.winning_message,
-            'popup_title': settings.popup_title,
-            'popup_message': settings.popup_message,
-            'wheel_colors': settings.wheel_colors,
-            'text_color': settings.text_color,
-            'spin_duration': settings.spin_duration,
-            'auto_spin': settings.auto_spin,
-            'show_confetti': settings.show_confetti,
-            'show_winner_popup': settings.show_winner_popup,
-            'enable_sound': settings.enable_sound,
-            'created_at': settings.created_at.isoformat() if settings.created_at else None,
-            'updated_at': settings.updated_at.isoformat() if settings.updated_at else None
-        }
-        
-        # Add URLs for assets
-        if settings.logo_path:
-            settings_data['logo_url'] = url_for('uploaded_file', filename=settings.logo_path, _external=True)
-        
-        if settings.background_path:
-            settings_data['background_url'] = url_for('uploaded_file', filename=settings.background_path, _external=True)
-        
-        if settings.popup_image_path:
-            settings_data['popup_image_url'] = url_for('uploaded_file', filename=settings.popup_image_path, _external=True)
-        
-        if settings.music_path:
-            settings_data['music_url'] = url_for('uploaded_file', filename=settings.music_path, _external=True)
+        # Local writes bump the version; updated_at catches writes made by other workers
+        key = (get_settings_version(), settings.updated_at, request.host_url)
+        entry = _settings_api_cache['entry']
+        if entry is None or entry[0] != key:
+            entry = _settings_api_cache['entry'] = (key, *_build_settings_payload(settings))
+        _, payload, etag = entry
         
-        return jsonify({
-            'success': True,
-            'data': settings_data
-        })
+        response = Response(payload, mimetype='application/json')
+        response.set_etag(etag, weak=True)
+        return response.make_conditional(request)
         
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    except Exception:
+        return _api_error()
+
+# Seconds a worker may serve the stats counters from memory; they are full-table counts,
+# so even one scan per table grows with the spin history and shouldn't run per request
+STATS_CACHE_TTL = 60
+
+# Last serialized /api/v1/stats body as (expires, payload)
+_stats_api_cache = {'entry': None}
 
 @app.route('/api/v1/stats', methods=['GET'])
 def api_get_stats():
     """Get application statistics for mobile app"""
+    from sqlalchemy import func, select, true
+    
+    entry = _stats_api_cache['entry']
+    if entry is not None and time.monotonic() < entry[0]:
+        return Response(entry[1], mimetype='application/json')
+    
     try:
+        # One scan per table with conditional counts, each aggregate a one-row subquery,
+        # joined side by side so all seven numbers come back in a single round-trip
+        vouchers = select(
+            func.count(),
+            func.count().filter(Voucher.is_used.is_(False)),
+            func.count().filter(Voucher.is_used.is_(True)),
+            func.count().filter(Voucher.is_vip.is_(True), Voucher.is_used.is_(False)),
+        ).select_from(Voucher).subquery()
+        prizes = select(func.count()).select_from(Prize).where(Prize.is_active.is_(True)).subquery()
+        spins = select(func.count(), func.count(SpinResult.username)).select_from(SpinResult).subquery()
+        (total_vouchers, active_vouchers, used_vouchers, vip_vouchers,
+         total_prizes, total_spins, recent_winners) = db.session.execute(
+            select(vouchers, prizes, spins).select_from(vouchers.join(prizes, true()).join(spins, true()))
+        ).one()
+        
         stats = {
-            'total_prizes': Prize.query.filter_by(is_active=True).count(),
-            'total_vouchers': Voucher.query.count(),
-            'active_vouchers': Voucher.query.filter_by(is_used=False).count(),
-            'used_vouchers': Voucher.query.filter_by(is_used=True).count(),
-            'vip_vouchers': Voucher.query.filter_by(is_vip=True, is_used=False).count(),
-            'total_spins': SpinResult.query.count(),
-            'recent_winners': SpinResult.query.filter(SpinResult.username.isnot(None)).count()
+            'total_prizes': total_prizes,
+            'total_vouchers': total_vouchers,
+            'active_vouchers': active_vouchers,
+            'used_vouchers': used_vouchers,
+            'vip_vouchers': vip_vouchers,
+            'total_spins': total_spins,
+            'recent_winners': recent_winners
         }
-        
-        return jsonify({
+        payload = app.json.dumps({
             'success': True,
             'data': stats
-        })
+        }).encode()
+        _stats_api_cache['entry'] = (time.monotonic() + STATS_CACHE_TTL, payload)
+        return Response(payload, mimetype='application/json')
         
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    except Exception:
+        return _api_error()
 
 # Error handlers
 @app.errorhandler(404)
 def not_found_error(error):
     return render_template('404.html'), 404
 
+@app.errorhandler(413)
+def request_entity_too_large(error):
+    if request.path.startswith('/api/'):
+        return jsonify({'success': False, 'error': 'Upload too large'}), 413
+    flash('File terlalu besar. Maksimum 60MB per upload.', 'error')
+    return redirect(request.referrer or url_for('index'))
+
 @app.errorhandler(500)
 def internal_error(error):
-    db.session.rollback()
+    # The session is scoped to this request; only roll back if it actually opened a transaction
+    if db.session().in_transaction():
+        db.session.rollback()
+    if request.path.startswith('/api/'):
+        return Response(API_ERROR_BODY, status=500, mimetype='application/json')
     return render_template('500.html'), 500
@@ -0,0 +1,83 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Configure the app for an in-memory database before it is imported
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ.setdefault('SKIP_DIR_INIT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+
+import main  # noqa: F401  (registers the routes)
+import routes
+from app import app as flask_app, db
+from models import Prize, SpinResult, Voucher
+
+
+@pytest.fixture
+def app():
+    """App with empty tables and cold API caches"""
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    routes.invalidate_winners_cache()
+    routes._stats_api_cache['entry'] = None
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    """Test client with an admin session"""
+    with client.session_transaction() as sess:
+        sess['admin_id'] = 1
+    return client
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements run inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with flask_app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed_spins(app, count, same_time=0, prefix='T'):
+    """Add one prize and `count` used vouchers with a spin each.
+
+    The first `same_time` spins take spun_at from the server default, as real spins do,
+    so they share one timestamp and pagination has ties to break.
+    """
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    with app.app_context():
+        prize = Prize(name='Hadiah', probability=100.0)
+        db.session.add(prize)
+        db.session.flush()
+        for i in range(count):
+            voucher = Voucher(code=f'{prefix}{i:05d}', is_used=True, used_at=start)
+            db.session.add(voucher)
+            db.session.flush()
+            spin = SpinResult(voucher_id=voucher.id, prize_id=prize.id, username=f'user{i}')
+            if i >= same_time:
+                spin.spun_at = start + timedelta(minutes=i)
+            db.session.add(spin)
+        db.session.commit()
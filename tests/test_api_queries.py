@@ -0,0 +1,71 @@
+"""Query-count bounds for the hot API paths, so N+1 regressions fail the suite"""
+import routes
+from conftest import count_queries, seed_spins
+
+
+def test_winners_runs_one_query(app, client):
+    seed_spins(app, 30)
+    with count_queries() as queries:
+        response = client.get('/api/v1/winners?limit=25')
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 25
+    assert len(queries) == 1
+
+
+def test_winners_cache_hit_runs_no_query(app, client):
+    seed_spins(app, 5)
+    client.get('/api/v1/winners')
+    with count_queries() as queries:
+        assert client.get('/api/v1/winners').status_code == 200
+    assert queries == []
+
+
+def test_stats_runs_one_query(app, client):
+    seed_spins(app, 10)
+    with count_queries() as queries:
+        response = client.get('/api/v1/stats')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['total_spins'] == 10
+    assert data['used_vouchers'] == 10
+    assert len(queries) <= 1
+
+
+def test_admin_vouchers_query_count_does_not_grow_with_rows(app, admin_client):
+    # raiseload('*') turns an unplanned relationship access into a 500, and
+    # a per-row lazy load would make the count grow with the voucher list
+    seed_spins(app, 2)
+    with count_queries() as few:
+        assert admin_client.get('/admin/vouchers').status_code == 200
+    seed_spins(app, 20, prefix='U')
+    with count_queries() as many:
+        assert admin_client.get('/admin/vouchers').status_code == 200
+    assert len(many) == len(few)
+
+
+def test_api_error_returns_generic_body(client):
+    response = client.post('/api/v1/voucher/validate', data='not json')
+    assert response.status_code == 500
+    assert response.get_json() == {'success': False, 'error': 'internal_error'}
+
+
+def test_winners_keyset_pages_cover_feed_once(app, client):
+    # 12 spins share the server-default timestamp, the rest have distinct explicit ones
+    seed_spins(app, 25, same_time=12)
+    seen = []
+    url = '/api/v1/winners?limit=4'
+    for _ in range(20):
+        body = client.get(url).get_json()
+        seen.extend(winner['id'] for winner in body['data'])
+        if body['next_cursor'] is None:
+            break
+        url = f"/api/v1/winners?limit=4&before_id={body['next_cursor']['before_id']}"
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+def test_winners_limit_is_clamped(app, client, monkeypatch):
+    monkeypatch.setattr(routes, 'WINNERS_MAX_LIMIT', 2)
+    seed_spins(app, 3)
+    assert client.get('/api/v1/winners?limit=-5').get_json()['count'] == 1
+    assert client.get('/api/v1/winners?limit=100000').get_json()['count'] == 2
@@ -0,0 +1,49 @@
+"""Inserts into tables created before the timestamp columns had a server DEFAULT"""
+import pytest
+from sqlalchemy import MetaData
+
+from conftest import seed_spins
+from app import db
+from models import Prize, SpinResult, Voucher
+
+
+@pytest.fixture
+def legacy_app(app):
+    """Recreate the tables without server defaults, as create_all left them on older databases"""
+    with app.app_context():
+        legacy = MetaData()
+        for table in db.metadata.sorted_tables:
+            table.to_metadata(legacy)
+        for table in legacy.tables.values():
+            for column in table.columns:
+                column.server_default = None
+        db.drop_all()
+        legacy.create_all(db.engine)
+    return app
+
+
+def test_new_rows_get_timestamps_without_server_default(legacy_app, client):
+    with legacy_app.app_context():
+        db.session.add(Prize(name='Hadiah', probability=100.0))
+        Voucher.bulk_create('T', 3)
+        db.session.commit()
+        assert all(v.created_at is not None for v in Voucher.query.all())
+        code = Voucher.query.first().code
+
+    response = client.post('/api/v1/spin', json={'voucher_code': code})
+    assert response.status_code == 200
+    with legacy_app.app_context():
+        assert SpinResult.query.one().spun_at is not None
+    assert client.get('/api/v1/winners').get_json()['data'][0]['spun_at'] is not None
+
+
+def test_keyset_pages_cover_spins_without_server_default(legacy_app, client):
+    seed_spins(legacy_app, 9, same_time=9)
+    seen = []
+    url = '/api/v1/winners?limit=4'
+    while url:
+        body = client.get(url).get_json()
+        seen.extend(winner['id'] for winner in body['data'])
+        cursor = body['next_cursor']
+        url = cursor and f"/api/v1/winners?limit=4&before_id={cursor['before_id']}"
+    assert sorted(seen) == list(range(1, 10))
@@ -0,0 +1,45 @@
+"""Settings image uploads are resized before their filename is stored"""
+import io
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from models import WheelSettings
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def _jpeg(size):
+    data = io.BytesIO()
+    Image.new('RGB', size, 'red').save(data, 'JPEG')
+    data.seek(0)
+    return data
+
+
+def test_background_is_stored_resized(app, admin_client, upload_dir, monkeypatch):
+    # The resized image is encoded straight from the upload stream; the raw file is never written
+    def fail_save(self, dst, buffer_size=16384):
+        raise AssertionError('raw upload written to disk')
+    monkeypatch.setattr(FileStorage, 'save', fail_save)
+    response = admin_client.post('/admin/settings/update', data={'background': (_jpeg((2000, 1500)), 'big.jpg')},
+                                 content_type='multipart/form-data')
+    assert response.status_code == 302
+    with app.app_context():
+        filename = db.session.get(WheelSettings, 1).background_path
+    with Image.open(upload_dir / filename) as img:
+        assert img.size == (1067, 800)
+
+
+def test_undecodable_upload_is_kept_as_is(app, admin_client, upload_dir):
+    response = admin_client.post('/admin/settings/update', data={'background': (io.BytesIO(b'not an image'), 'x.png')},
+                                 content_type='multipart/form-data')
+    assert response.status_code == 302
+    with app.app_context():
+        filename = db.session.get(WheelSettings, 1).background_path
+    assert (upload_dir / filename).read_bytes() == b'not an image'
@@ -0,0 +1,62 @@
+"""Deleting vouchers that spin history still references"""
+from conftest import seed_spins
+from app import db
+from models import Voucher
+
+
+def _ids(app, **filters):
+    with app.app_context():
+        return [v.id for v in Voucher.query.filter_by(**filters)]
+
+
+def test_bulk_delete_used_vouchers_with_history_reports_failure(app, admin_client):
+    seed_spins(app, 3)
+    response = admin_client.post('/admin/vouchers/bulk-delete',
+                                 json={'voucher_ids': _ids(app, is_used=True), 'type': 'used'})
+    body = response.get_json()
+    assert body['success'] is False
+    assert body['deleted_count'] == 0
+    assert body['skipped_count'] == 3
+    assert len(_ids(app, is_used=True)) == 3
+
+
+def test_bulk_delete_reports_skipped_vouchers(app, admin_client):
+    seed_spins(app, 2)
+    with app.app_context():
+        db.session.add(Voucher(code='FREE1', is_used=True))
+        db.session.commit()
+    response = admin_client.post('/admin/vouchers/bulk-delete',
+                                 json={'voucher_ids': _ids(app, is_used=True), 'type': 'used'})
+    body = response.get_json()
+    assert body['success'] is True
+    assert body['deleted_count'] == 1
+    assert body['skipped_count'] == 2
+
+
+def _make_vip_vouchers(app):
+    """One VIP voucher with spin history and one without; returns (used_id, fresh_id)"""
+    seed_spins(app, 1)
+    with app.app_context():
+        used = Voucher.query.one()
+        used.is_vip = True
+        fresh = Voucher(code='VIPNEW', is_vip=True)
+        db.session.add(fresh)
+        db.session.commit()
+        return used.id, fresh.id
+
+
+def test_delete_vip_voucher_with_history_is_refused(app, admin_client):
+    used_id, _ = _make_vip_vouchers(app)
+    response = admin_client.post(f'/admin/vip-vouchers/delete/{used_id}')
+    assert response.status_code == 409
+    assert 'riwayat spin' in response.get_json()['message']
+
+
+def test_bulk_delete_vip_vouchers_names_the_kept_ones(app, admin_client):
+    used_id, fresh_id = _make_vip_vouchers(app)
+    body = admin_client.post('/admin/vip-vouchers/bulk-delete',
+                             json={'voucher_ids': [used_id, fresh_id]}).get_json()
+    assert body['success'] is True
+    assert body['kept_codes'] == ['T00000']
+    assert 'T00000' in body['message']
+    assert _ids(app, is_vip=True) == [used_id]